@@ -1,11 +1,21 @@
 import concurrent.futures
 import copy
+import functools
 import json
+import os
+import queue
+import re
+import tempfile
 import threading
 import time
 from pathlib import Path
 from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
 from db_firebird import (
     conectar_firebird,
     executar_query_firebird,
@@ -14,6 +24,7 @@ from db_firebird import (
 )
 from db_mssql import (
     conectar_mssql,
+    estimar_registros_mssql,
     executar_query_mssql,
     listar_tabelas_mssql,
     obter_versao_mssql,
@@ -22,7 +33,9 @@ from dump import (
     MigrationSummary,
     OperationCancelled,
     criar_handler_destino,
+    emprestar_conexao,
     executar_dump,
+    fechar_pools,
 )
 from html_logger import (
     HtmlLogWriter,
@@ -33,28 +46,168 @@ from html_logger import (
 ConfigDict = Dict[str, object]
 SQLListener = Callable[[str], None]
 LogFunction = Callable[[str], None]
-ConstraintPrompt = Callable[[str, str], Optional[str]]
+ConstraintPrompt = Callable[
+    [Sequence[Tuple[str, str]]], Dict[Tuple[str, str], str]
+]
+
+_TABELAS_POR_CONTAGEM = 100
+_IDENTIFICADOR_SEGURO = re.compile(r"^[A-Za-z_][A-Za-z0-9_$]*$")
+
+
+def _json_loads(conteudo: bytes) -> ConfigDict:
+    if orjson is not None:
+        return orjson.loads(conteudo)
+    return json.loads(conteudo)
+
+
+def _json_dumps(config: ConfigDict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(config, option=orjson.OPT_INDENT_2)
+    return json.dumps(config, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _gravar_atomicamente(caminho: Path, conteudo: bytes) -> None:
+    # Grava ao lado e troca de uma vez: uma interrupção não deixa o arquivo
+    # pela metade.
+    descritor, temporario = tempfile.mkstemp(
+        dir=caminho.parent, prefix=f".{caminho.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(conteudo)
+        if caminho.exists():
+            # mkstemp cria com 0600; o arquivo trocado mantém as permissões.
+            os.chmod(temporario, caminho.stat().st_mode & 0o777)
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.unlink(temporario)
+        except OSError:
+            pass
+        raise
+
+
+_CACHE_TABELAS_PADRAO = Path.home() / ".dumpfb_tables.json"
+
+
+def _chave_cache_tabelas(configuracao: Dict[str, object]) -> str:
+    # Identifica o banco sem incluir credenciais no arquivo de cache.
+    parametros = configuracao.get("database", {})
+    return "|".join(
+        str(valor)
+        for valor in (
+            configuracao.get("type", ""),
+            parametros.get("host") or parametros.get("server") or "",
+            parametros.get("port", ""),
+            parametros.get("database", ""),
+        )
+    )
+
+
+def _citar_identificador(tipo: str, nome: str) -> str:
+    # Nomes simples seguem sem aspas: no Firebird, "nome" entre aspas passa a
+    # diferenciar maiúsculas de minúsculas.
+    if _IDENTIFICADOR_SEGURO.match(nome):
+        return nome
+    if tipo.lower() == "mssql":
+        return "[" + nome.replace("]", "]]") + "]"
+    return '"' + nome.replace('"', '""') + '"'
+
+
+def _registrar_com_tabela(log_fn: LogFunction, tabela: str, mensagem: str) -> None:
+    log_fn(f"[{tabela}] {mensagem}")
+
+
+class _DaemonThreadPool:
+    """Minimal executor whose worker threads never block interpreter exit."""
+
+    # As threads de ThreadPoolExecutor são aguardadas na saída do interpretador:
+    # fechar a janela ficaria preso a uma chamada ao banco em andamento.
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "trabalhador"):
+        self._tarefas: "queue.Queue" = queue.Queue()
+        self._threads = [
+            threading.Thread(
+                target=self._trabalhar,
+                name=f"{thread_name_prefix}-{indice}",
+                daemon=True,
+            )
+            for indice in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, *args, **kwargs) -> concurrent.futures.Future:
+        futuro: concurrent.futures.Future = concurrent.futures.Future()
+        self._tarefas.put((futuro, fn, args, kwargs))
+        return futuro
+
+    def _trabalhar(self) -> None:
+        while True:
+            item = self._tarefas.get()
+            if item is None:
+                return
+            futuro, fn, args, kwargs = item
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            try:
+                resultado = fn(*args, **kwargs)
+            except BaseException as erro:
+                futuro.set_exception(erro)
+            else:
+                futuro.set_result(resultado)
+
+    def shutdown(self, wait: bool = True) -> None:
+        for _ in self._threads:
+            self._tarefas.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self) -> "_DaemonThreadPool":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.shutdown(wait=True)
 
 
 class ApplicationController:
-    def __init__(self, config_path: str = "config.json") -> None:
+    def __init__(
+        self,
+        config_path: str = "config.json",
+        tables_cache_path: Optional[str] = None,
+    ) -> None:
         self.config_path = Path(config_path)
+        self.tables_cache_path = (
+            Path(tables_cache_path) if tables_cache_path else _CACHE_TABELAS_PADRAO
+        )
+        self._config_mtime_ns: Optional[int] = None
         self.config: ConfigDict = self._load_config()
         self.source_connection = None
         self.destination_connection = None
         self._sql_history: List[str] = []
         self._sql_listeners: List[SQLListener] = []
         self._cancel_event = threading.Event()
+        # Tamanho de lote aprendido por auto_chunk_size na última migração. Só
+        # vale para as próximas execuções; settings.chunk_size continua sendo o
+        # valor escolhido pelo usuário.
+        self._tamanho_lote_aprendido: Optional[int] = None
 
     def _load_config(self) -> ConfigDict:
         if not self.config_path.exists():
             raise FileNotFoundError(
                 f"Arquivo de configuração não encontrado: {self.config_path}"
             )
-        with self.config_path.open("r", encoding="utf-8") as arquivo:
-            return json.load(arquivo)
+        self._config_mtime_ns = self.config_path.stat().st_mtime_ns
+        return _json_loads(self.config_path.read_bytes())
 
     def reload_config(self) -> None:
+        try:
+            mtime_ns = self.config_path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is not None and mtime_ns == self._config_mtime_ns:
+            return
         self.config = self._load_config()
 
     def get_config(self) -> ConfigDict:
@@ -62,8 +215,15 @@ class ApplicationController:
 
     def save_config(self, novo_config: ConfigDict) -> None:
         self.config = copy.deepcopy(novo_config)
-        with self.config_path.open("w", encoding="utf-8") as arquivo:
-            json.dump(self.config, arquivo, indent=2, ensure_ascii=False)
+        self._tamanho_lote_aprendido = None
+        conteudo = _json_dumps(self.config)
+        try:
+            inalterado = self.config_path.read_bytes() == conteudo
+        except OSError:
+            inalterado = False
+        if not inalterado:
+            _gravar_atomicamente(self.config_path, conteudo)
+            self._config_mtime_ns = self.config_path.stat().st_mtime_ns
         self.disconnect()
 
     def register_sql_listener(self, listener: SQLListener) -> None:
@@ -101,10 +261,35 @@ class ApplicationController:
     def _list_tables(self, connection, tipo: str) -> Sequence[str]:
         tipo = tipo.lower()
         if tipo == "firebird":
-            return listar_tabelas_firebird(connection)
-        if tipo == "mssql":
-            return listar_tabelas_mssql(connection)
-        raise ValueError(f"Tipo de banco desconhecido: {tipo}")
+            tabelas = listar_tabelas_firebird(connection)
+        elif tipo == "mssql":
+            tabelas = listar_tabelas_mssql(connection)
+        else:
+            raise ValueError(f"Tipo de banco desconhecido: {tipo}")
+        self._salvar_cache_tabelas(tabelas)
+        return tabelas
+
+    def _ler_cache_tabelas(self) -> Dict[str, List[str]]:
+        try:
+            cache = _json_loads(self.tables_cache_path.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def _salvar_cache_tabelas(self, tabelas: Sequence[str]) -> None:
+        cache = self._ler_cache_tabelas()
+        cache[_chave_cache_tabelas(self.config["source"])] = list(tabelas)
+        try:
+            _gravar_atomicamente(self.tables_cache_path, _json_dumps(cache))
+        except OSError:
+            # O cache só acelera a abertura; sem ele a lista vem do banco.
+            pass
+
+    def get_cached_tables(self) -> Optional[List[str]]:
+        tabelas = self._ler_cache_tabelas().get(
+            _chave_cache_tabelas(self.config["source"])
+        )
+        return list(tabelas) if isinstance(tabelas, list) else None
 
     def connect(self, log_fn: LogFunction) -> Sequence[str]:
         self.disconnect()
@@ -133,6 +318,7 @@ class ApplicationController:
                 pass
         self.source_connection = None
         self.destination_connection = None
+        fechar_pools()
 
     def is_connected(self) -> bool:
         return (
@@ -220,28 +406,35 @@ class ApplicationController:
                     raise OperationCancelled("Migração cancelada antes do início.")
 
                 worker_count = int(self.config["settings"].get("worker_count", 1))
-                if worker_count < 1:
-                    worker_count = 1
+                worker_count = max(1, min(worker_count, len(tabelas)))
 
                 erros: List[Tuple[str, Exception]] = []
+                config_execucao = self._config_para_execucao()
+                aprendidos: List[Tuple[int, int]] = []
 
-                with concurrent.futures.ThreadPoolExecutor(
-                    max_workers=worker_count
-                ) as executor:
+                with _DaemonThreadPool(worker_count, "migracao") as executor:
                     futuros = {}
                     for tabela in tabelas:
                         if self._cancel_event.is_set():
                             break
                         log_fn(f"🔄 Iniciando migração da tabela '{tabela}'...")
+                        # Com trabalhadores em paralelo as mensagens se intercalam.
+                        log_tabela = (
+                            functools.partial(_registrar_com_tabela, log_fn, tabela)
+                            if worker_count > 1
+                            else log_fn
+                        )
                         futuros[
+                            # Sem conexões compartilhadas: cada trabalhador pega
+                            # as suas do pool e as devolve ao terminar.
                             executor.submit(
                                 executar_dump,
                                 tabela,
-                                self.config,
+                                config_execucao,
                                 None,
-                                log_fn,
+                                log_tabela,
                                 self._notify_sql,
-                                constraint_prompt,
+                                None,
                                 False,
                                 self._cancel_event,
                                 False,
@@ -272,6 +465,18 @@ class ApplicationController:
                             )
                             self._registrar_comparacao(tabela_atual, resumo, log_fn)
                             html_logger.merge_comparison(resumo.comparacao_modelo)
+                            if resumo.tamanho_lote_aprendido:
+                                aprendidos.append(
+                                    (
+                                        resumo.total_inseridos,
+                                        resumo.tamanho_lote_aprendido,
+                                    )
+                                )
+
+                # A maior tabela teve mais lotes medidos; o valor dela é o mais
+                # confiável.
+                if aprendidos:
+                    self._tamanho_lote_aprendido = max(aprendidos)[1]
 
                 if self._cancel_event.is_set():
                     log_fn("⏹️ Migração cancelada pelo usuário.")
@@ -308,13 +513,29 @@ class ApplicationController:
                     )
         finally:
             html_logger.set_total_migration_time(time.time() - migration_started_at)
+            destino_db_cfg = destino_cfg.get("database", {})
             destino_tamanho = obter_tamanho_banco_destino(
-                destino_cfg["type"], self.destination_connection
+                destino_cfg["type"],
+                self.destination_connection,
+                destino_db_cfg.get("database")
+                if isinstance(destino_db_cfg, dict)
+                else None,
             )
             html_logger.set_destination_size(destino_tamanho)
             log_fn(f"📄 Relatório salvo em: {html_logger.file_path}")
             html_logger.finalize()
 
+    def _config_para_execucao(self) -> ConfigDict:
+        settings = self.config["settings"]
+        if self._tamanho_lote_aprendido is None or not settings.get(
+            "auto_chunk_size", False
+        ):
+            return self.config
+        return {
+            **self.config,
+            "settings": {**settings, "chunk_size": self._tamanho_lote_aprendido},
+        }
+
     def _limpar_tabelas(
         self, destino_handler, tabelas: Sequence[str], log_fn: LogFunction
     ) -> None:
@@ -375,40 +596,56 @@ class ApplicationController:
         if constraint_prompt is None:
             return pendentes
 
-        for tabela_nome, constraint_nome in pendentes:
-            resolvido = False
-            while True:
-                comando_manual = constraint_prompt(tabela_nome, constraint_nome)
+        # Todas as pendências são apresentadas de uma vez; as que receberam
+        # comando e continuaram falhando voltam numa nova rodada. ALTER TABLE
+        # ... WITH CHECK CHECK CONSTRAINT só conclui sem erro quando a
+        # constraint fica ativa, então o catálogo é consultado apenas no final.
+        aguardando = pendentes
+        while aguardando:
+            comandos = constraint_prompt(aguardando)
+            falharam: List[Tuple[str, str]] = []
+            for tabela_nome, constraint_nome in aguardando:
+                comando_manual = comandos.get((tabela_nome, constraint_nome))
                 if not comando_manual:
-                    break
-                try:
-                    destino_handler.execute_sql(comando_manual)
-                except Exception as erro_execucao:
-                    log_fn(f"[ERRO] ao executar comando manual: {erro_execucao}")
-                    continue
-                try:
-                    destino_handler.enable_specific_constraint(
-                        tabela_nome, constraint_nome
-                    )
-                except Exception as erro_constraint:
                     log_fn(
-                        f"[ERRO] ao reativar constraint {constraint_nome}: {erro_constraint}"
+                        f"[AVISO] Constraint {constraint_nome} permaneceu desativada após tentativas manuais na tabela {tabela_nome}."
                     )
                     continue
-                pendentes_atual = destino_handler.list_disabled_constraints()
-                if (tabela_nome, constraint_nome) not in pendentes_atual:
-                    log_fn(
-                        f"🔒 Constraint {constraint_nome} reativada após ajuste manual."
-                    )
-                    resolvido = True
-                    break
-            if not resolvido:
-                log_fn(
-                    f"[AVISO] Constraint {constraint_nome} permaneceu desativada após tentativas manuais na tabela {tabela_nome}."
-                )
+                if not self._aplicar_ajuste_constraint(
+                    destino_handler,
+                    log_fn,
+                    tabela_nome,
+                    constraint_nome,
+                    comando_manual,
+                ):
+                    falharam.append((tabela_nome, constraint_nome))
+            aguardando = falharam
 
         return list(destino_handler.list_disabled_constraints())
 
+    def _aplicar_ajuste_constraint(
+        self,
+        destino_handler,
+        log_fn: LogFunction,
+        tabela_nome: str,
+        constraint_nome: str,
+        comando_manual: str,
+    ) -> bool:
+        try:
+            destino_handler.execute_sql(comando_manual)
+        except Exception as erro_execucao:
+            log_fn(f"[ERRO] ao executar comando manual: {erro_execucao}")
+            return False
+        try:
+            destino_handler.enable_specific_constraint(tabela_nome, constraint_nome)
+        except Exception as erro_constraint:
+            log_fn(
+                f"[ERRO] ao reativar constraint {constraint_nome}: {erro_constraint}"
+            )
+            return False
+        log_fn(f"🔒 Constraint {constraint_nome} reativada após ajuste manual.")
+        return True
+
     def _registrar_comparacao(
         self, tabela: str, resumo: MigrationSummary, log_fn: LogFunction
     ) -> None:
@@ -428,34 +665,98 @@ class ApplicationController:
                     f"  • {categoria}: itens presentes apenas no destino: {', '.join(excedentes)}"
                 )
 
-    def count_records(self, tabelas: Sequence[str], log_fn: LogFunction) -> None:
+    def count_records(
+        self,
+        tabelas: Sequence[str],
+        log_fn: LogFunction,
+        aproximado: bool = False,
+    ) -> None:
         if not tabelas:
             raise ValueError("Nenhuma tabela selecionada para contagem.")
 
         self._ensure_connections()
 
-        for tabela in tabelas:
-            origem_total = self._contar_registros(
-                self.source_connection, self.config["source"]["type"], tabela
+        # Cada banco tem sua própria conexão, então as duas contagens podem
+        # rodar ao mesmo tempo.
+        with _DaemonThreadPool(2, "contagem") as executor:
+            futuro_origem = executor.submit(
+                self._contar_registros_tabelas,
+                self.source_connection,
+                self.config["source"]["type"],
+                tabelas,
+                aproximado,
             )
-            destino_total = self._contar_registros(
-                self.destination_connection, self.config["destination"]["type"], tabela
+            futuro_destino = executor.submit(
+                self._contar_registros_tabelas,
+                self.destination_connection,
+                self.config["destination"]["type"],
+                tabelas,
+                aproximado,
             )
+            totais_origem = futuro_origem.result()
+            totais_destino = futuro_destino.result()
+
+        if aproximado:
             log_fn(
-                f"📌 {tabela} - Total na origem: {origem_total} | Total no destino: {destino_total}"
+                "ℹ️ Contagem rápida: totais do MSSQL vêm das estatísticas do banco "
+                "e podem diferir ligeiramente do COUNT(*)."
             )
+        for tabela in tabelas:
+            log_fn(
+                f"📌 {tabela} - Total na origem: {totais_origem[tabela]} | Total no destino: {totais_destino[tabela]}"
+            )
+
+    def _contar_registros_tabelas(
+        self, conexao, tipo: str, tabelas: Sequence[str], aproximado: bool = False
+    ) -> Dict[str, int]:
+        totais: Dict[str, int] = {}
+        # Um cursor para todas as consultas desta contagem.
+        cursor = conexao.cursor()
+        # O Firebird não mantém contagem de linhas; lá o COUNT(*) é a única opção.
+        if aproximado and tipo.lower() == "mssql":
+            totais.update(estimar_registros_mssql(conexao, tabelas))
+        seguras = [
+            tabela
+            for tabela in tabelas
+            if tabela not in totais and _IDENTIFICADOR_SEGURO.match(tabela)
+        ]
+        for inicio in range(0, len(seguras), _TABELAS_POR_CONTAGEM):
+            grupo = seguras[inicio : inicio + _TABELAS_POR_CONTAGEM]
+            consulta = " UNION ALL ".join(
+                f"SELECT {indice}, COUNT(*) FROM {tabela}"
+                for indice, tabela in enumerate(grupo)
+            )
+            try:
+                resultados = self._executar_query(conexao, tipo, consulta, cursor)
+            except Exception:
+                # Uma tabela inexistente derruba o grupo; as restantes são
+                # contadas uma a uma abaixo, preservando o erro original.
+                try:
+                    conexao.rollback()
+                except Exception:
+                    pass
+                continue
+            for indice, total in resultados:
+                totais[grupo[int(indice)]] = int(total)
+
+        for tabela in tabelas:
+            if tabela not in totais:
+                totais[tabela] = self._contar_registros(conexao, tipo, tabela, cursor)
+        return totais
 
-    def _contar_registros(self, conexao, tipo: str, tabela: str) -> int:
-        consulta = f"SELECT COUNT(*) FROM {tabela}"
-        resultados = self._executar_query(conexao, tipo, consulta)
+    def _contar_registros(self, conexao, tipo: str, tabela: str, cursor=None) -> int:
+        consulta = f"SELECT COUNT(*) FROM {_citar_identificador(tipo, tabela)}"
+        resultados = self._executar_query(conexao, tipo, consulta, cursor)
         return int(resultados[0][0]) if resultados else 0
 
-    def _executar_query(self, conexao, tipo: str, consulta: str):
+    def _executar_query(self, conexao, tipo: str, consulta: str, cursor=None):
         tipo = tipo.lower()
         if tipo == "firebird":
-            return executar_query_firebird(conexao, consulta, self._notify_sql)
+            return executar_query_firebird(
+                conexao, consulta, self._notify_sql, cursor
+            )
         if tipo == "mssql":
-            return executar_query_mssql(conexao, consulta, self._notify_sql)
+            return executar_query_mssql(conexao, consulta, self._notify_sql, cursor)
         raise ValueError(f"Tipo de banco desconhecido: {tipo}")
 
     def test_connection(self, destino: str, log_fn: LogFunction) -> None:
@@ -464,15 +765,20 @@ class ApplicationController:
             raise ValueError("Destino de teste inválido.")
 
         configuracao = self.config[destino]
-        conexao = self._connect_database(configuracao)
-        try:
-            tipo = str(configuracao["type"]).lower()
+        tipo = str(configuracao["type"]).lower()
+        if tipo not in {"firebird", "mssql"}:
+            raise ValueError(f"Tipo de banco desconhecido: {tipo}")
+        # Conexões de teste vêm do mesmo pool da migração e voltam para ele. A
+        # conexão emprestada é sempre checada: se o servidor a encerrou, o
+        # teste usa uma nova em vez de acusar falha.
+        tamanho_pool = int(self.config["settings"].get("worker_count", 1))
+        with emprestar_conexao(
+            tipo, configuracao["database"], tamanho_pool, verificar=True
+        ) as conexao:
             if tipo == "firebird":
                 versao = obter_versao_firebird(conexao)
-            elif tipo == "mssql":
-                versao = obter_versao_mssql(conexao)
             else:
-                raise ValueError(f"Tipo de banco desconhecido: {tipo}")
+                versao = obter_versao_mssql(conexao)
 
             log_fn(f"✅ Conexão com {destino} bem-sucedida. Versão: {versao}")
 
@@ -482,11 +788,6 @@ class ApplicationController:
                 log_fn(
                     f"ℹ️ Resultado da consulta de informações ({len(resultados)} linhas retornadas)."
                 )
-        finally:
-            try:
-                conexao.close()
-            except Exception:
-                pass
 
     def get_info_query(self) -> str:
         return str(self.config["settings"].get("info_query", ""))
@@ -1,9 +1,10 @@
-from typing import Iterable, List, Sequence, Set
-
-import fdb
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
 
 
 def conectar_firebird(config: dict):
+    # O driver só é carregado na primeira conexão, não na abertura da interface.
+    import fdb
+
     connection = fdb.connect(
         dsn=f"{config['host']}/{config['port']}:{config['database']}",
         user=config["user"],
@@ -26,19 +27,66 @@ def listar_tabelas_firebird(connection) -> List[str]:
     return [row[0].strip() for row in cursor.fetchall()]
 
 
+def possui_colunas_blob_firebird(connection, tabela: str) -> bool:
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        SELECT FIRST 1 1
+        FROM rdb$relation_fields AS rf
+        INNER JOIN rdb$fields AS f ON f.rdb$field_name = rf.rdb$field_source
+        WHERE rf.rdb$relation_name = ?
+          AND f.rdb$field_type = 261
+        """,
+        (tabela,),
+    )
+    return cursor.fetchone() is not None
+
+
 def buscar_lotes_firebird(
-    connection, tabela: str, chunk_size: int = 5000, offset: int = 0
+    connection,
+    tabela: str,
+    chunk_size: int = 5000,
+    offset: int = 0,
+    tamanho_lote: Optional[Callable[[], int]] = None,
+    total: Optional[int] = None,
 ):
     cursor = connection.cursor()
-    cursor.execute(f"SELECT COUNT(*) FROM {tabela}")
-    total = cursor.fetchone()[0]
+    if total is None:
+        cursor.execute(f"SELECT COUNT(*) FROM {tabela}")
+        total = cursor.fetchone()[0]
 
     while offset < total:
+        if tamanho_lote is not None:
+            chunk_size = tamanho_lote()
         cursor.execute(f"SELECT FIRST {chunk_size} SKIP {offset} * FROM {tabela}")
         yield cursor.fetchall()
         offset += chunk_size
 
 
+def ler_lotes_firebird(
+    connection,
+    tabela: str,
+    chunk_size: int = 5000,
+    offset: int = 0,
+    tamanho_lote: Optional[Callable[[], int]] = None,
+    cursor=None,
+):
+    # Um cursor já executado (por exemplo, para ler as colunas) é reaproveitado.
+    if cursor is None:
+        cursor = connection.cursor()
+        consulta = f"SELECT * FROM {tabela}"
+        if offset:
+            consulta = f"SELECT SKIP {offset} * FROM {tabela}"
+        cursor.execute(consulta)
+    while True:
+        if tamanho_lote is not None:
+            chunk_size = tamanho_lote()
+        lote = cursor.fetchmany(chunk_size)
+        if not lote:
+            break
+        yield lote
+
+
 def limpar_tabela_firebird(connection, tabela: str, sql_logger=None) -> None:
     cursor = connection.cursor()
     comando = f"DELETE FROM {tabela}"
@@ -48,25 +96,49 @@ def limpar_tabela_firebird(connection, tabela: str, sql_logger=None) -> None:
     connection.commit()
 
 
+_SAVEPOINT_LOTE = "DUMP_LOTE"
+
+
+def montar_insert_firebird(tabela: str, colunas: Sequence[str]) -> str:
+    placeholders = ", ".join(["?"] * len(colunas))
+    colunas_str = ", ".join(colunas)
+    return f"INSERT INTO {tabela} ({colunas_str}) VALUES ({placeholders})"
+
+
 def inserir_lote_firebird(
     connection,
     tabela: str,
     colunas: Sequence[str],
-    dados: Iterable[Sequence],
+    dados: Sequence[Tuple],
     sql_logger=None,
+    commit: bool = True,
+    cursor=None,
+    comando=None,
 ) -> None:
-    dados = list(dados)
     if not dados:
         return
 
-    cursor = connection.cursor()
-    placeholders = ", ".join(["?"] * len(colunas))
-    colunas_str = ", ".join(colunas)
-    comando = f"INSERT INTO {tabela} ({colunas_str}) VALUES ({placeholders})"
+    if cursor is None:
+        cursor = connection.cursor()
+    if comando is None:
+        comando = montar_insert_firebird(tabela, colunas)
     if sql_logger:
-        sql_logger(comando)
-    cursor.executemany(comando, dados)
-    connection.commit()
+        sql_logger(getattr(comando, "sql", comando))
+
+    if commit:
+        cursor.executemany(comando, dados)
+        connection.commit()
+        return
+
+    # Dentro de uma transação longa, um lote com falha não pode deixar linhas
+    # parciais nem desfazer os lotes anteriores ainda não confirmados.
+    controle = connection.cursor()
+    controle.execute(f"SAVEPOINT {_SAVEPOINT_LOTE}")
+    try:
+        cursor.executemany(comando, dados)
+    except Exception:
+        controle.execute(f"ROLLBACK TO SAVEPOINT {_SAVEPOINT_LOTE}")
+        raise
 
 
 def obter_versao_firebird(connection) -> str:
@@ -78,63 +150,48 @@ def obter_versao_firebird(connection) -> str:
     return resultado[0] if resultado else "Desconhecida"
 
 
-def executar_query_firebird(connection, query: str, sql_logger=None) -> List[Sequence]:
-    cursor = connection.cursor()
+def executar_query_firebird(
+    connection, query: str, sql_logger=None, cursor=None
+) -> List[Sequence]:
+    if cursor is None:
+        cursor = connection.cursor()
     if sql_logger:
         sql_logger(query)
     cursor.execute(query)
-    try:
-        resultados = cursor.fetchall()
-    except fdb.ProgrammingError:
-        resultados = []
+    resultados = cursor.fetchall() if cursor.description is not None else []
     connection.commit()
     return resultados
 
 
-def listar_constraints_firebird(connection) -> Set[str]:
-    cursor = connection.cursor()
-    cursor.execute(
-        """
-        SELECT TRIM(rdb$constraint_name)
-        FROM rdb$relation_constraints
-        WHERE rdb$system_flag = 0 OR rdb$system_flag IS NULL
-        """
-    )
-    return {linha[0].strip() for linha in cursor.fetchall() if linha[0]}
+_CATEGORIAS_METADATA = ("constraints", "indexes", "procedures", "triggers")
 
 
-def listar_indices_firebird(connection) -> Set[str]:
+def listar_todos_objetos_firebird(connection) -> Dict[str, FrozenSet[str]]:
     cursor = connection.cursor()
     cursor.execute(
         """
-        SELECT TRIM(rdb$index_name)
+        SELECT 'constraints' AS kind, TRIM(rdb$constraint_name)
+        FROM rdb$relation_constraints
+        WHERE rdb$system_flag = 0 OR rdb$system_flag IS NULL
+        UNION ALL
+        SELECT 'indexes', TRIM(rdb$index_name)
         FROM rdb$indices
         WHERE (rdb$system_flag = 0 OR rdb$system_flag IS NULL)
           AND rdb$index_name IS NOT NULL
-        """
-    )
-    return {linha[0].strip() for linha in cursor.fetchall() if linha[0]}
-
-
-def listar_procedures_firebird(connection) -> Set[str]:
-    cursor = connection.cursor()
-    cursor.execute(
-        """
-        SELECT TRIM(rdb$procedure_name)
+        UNION ALL
+        SELECT 'procedures', TRIM(rdb$procedure_name)
         FROM rdb$procedures
         WHERE rdb$system_flag = 0 OR rdb$system_flag IS NULL
-        """
-    )
-    return {linha[0].strip() for linha in cursor.fetchall() if linha[0]}
-
-
-def listar_triggers_firebird(connection) -> Set[str]:
-    cursor = connection.cursor()
-    cursor.execute(
-        """
-        SELECT TRIM(rdb$trigger_name)
+        UNION ALL
+        SELECT 'triggers', TRIM(rdb$trigger_name)
         FROM rdb$triggers
         WHERE rdb$system_flag = 0 OR rdb$system_flag IS NULL
         """
     )
-    return {linha[0].strip() for linha in cursor.fetchall() if linha[0]}
+    objetos: Dict[str, Set[str]] = {
+        categoria: set() for categoria in _CATEGORIAS_METADATA
+    }
+    for categoria, nome in cursor.fetchall():
+        if nome:
+            objetos[categoria.strip()].add(nome.strip())
+    return {categoria: frozenset(nomes) for categoria, nomes in objetos.items()}
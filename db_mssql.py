@@ -1,9 +1,11 @@
-from typing import Iterable, List, Sequence, Set, Tuple
-
-import pymssql
+from itertools import chain
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
 
 
 def conectar_mssql(config: dict):
+    # O driver só é carregado na primeira conexão, não na abertura da interface.
+    import pymssql
+
     return pymssql.connect(
         server=config["server"],
         user=config["user"],
@@ -12,30 +14,129 @@ def conectar_mssql(config: dict):
     )
 
 
+_MAX_LINHAS_POR_INSERT = 1000
+_SAVEPOINT_LOTE = "DUMP_LOTE"
+
+
+def montar_insert_mssql(tabela: str, colunas: Sequence[str], linhas: int = 1) -> str:
+    placeholders = "(" + ", ".join(["%s"] * len(colunas)) + ")"
+    colunas_str = ", ".join(colunas)
+    valores = ", ".join([placeholders] * linhas)
+    return f"INSERT INTO {tabela} ({colunas_str}) VALUES {valores}"
+
+
 def inserir_lote_mssql(
     connection,
     tabela: str,
     colunas: Sequence[str],
-    dados: Iterable[Sequence],
+    dados: Sequence[Tuple],
     sql_logger=None,
+    cursor=None,
+    comandos: Optional[Dict[int, str]] = None,
+    commit: bool = True,
+    linhas_por_insert: Optional[int] = None,
 ) -> None:
-    dados = list(dados)
     if not dados:
         return
 
+    if cursor is None:
+        cursor = connection.cursor()
+    if comandos is None:
+        comandos = {}
+    if sql_logger:
+        # O texto de uma linha é o próprio comando cacheado para lotes de 1.
+        comando_log = comandos.get(1)
+        if comando_log is None:
+            comando_log = comandos[1] = montar_insert_mssql(tabela, colunas)
+        sql_logger(comando_log)
+
+    if not commit:
+        cursor.execute(f"SAVE TRANSACTION {_SAVEPOINT_LOTE}")
+
+    if linhas_por_insert is None:
+        linhas_por_insert = _MAX_LINHAS_POR_INSERT
+    linhas_por_insert = max(1, min(linhas_por_insert, _MAX_LINHAS_POR_INSERT))
+    try:
+        for inicio in range(0, len(dados), linhas_por_insert):
+            grupo = dados[inicio : inicio + linhas_por_insert]
+            comando = comandos.get(len(grupo))
+            if comando is None:
+                comando = montar_insert_mssql(tabela, colunas, len(grupo))
+                comandos[len(grupo)] = comando
+            cursor.execute(comando, tuple(chain.from_iterable(grupo)))
+        if commit:
+            connection.commit()
+    except Exception as erro:
+        if commit:
+            connection.rollback()
+        else:
+            # Desfaz só este lote; os anteriores continuam na transação.
+            try:
+                cursor.execute(f"ROLLBACK TRANSACTION {_SAVEPOINT_LOTE}")
+            except Exception:
+                pass
+        raise RuntimeError(f"Erro ao inserir lote: {erro}") from erro
+
+
+def suporta_bulk_copy(connection) -> bool:
+    return hasattr(getattr(connection, "_conn", None), "bulk_copy")
+
+
+def listar_posicoes_colunas_mssql(connection, tabela: str) -> Dict[str, int]:
     cursor = connection.cursor()
-    placeholders = ", ".join(["%s"] * len(colunas))
-    colunas_str = ", ".join(colunas)
-    comando = f"INSERT INTO {tabela} ({colunas_str}) VALUES ({placeholders})"
+    cursor.execute(
+        """
+        SELECT COLUMN_NAME, ORDINAL_POSITION
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_NAME = %s
+        """,
+        (tabela,),
+    )
+    return {nome.casefold(): posicao for nome, posicao in cursor.fetchall()}
+
+
+def copiar_lote_mssql(
+    connection,
+    tabela: str,
+    colunas: Sequence[str],
+    dados: Sequence[Tuple],
+    posicoes: Sequence[int],
+    sql_logger=None,
+    commit: bool = True,
+) -> None:
+    if not dados:
+        return
+
     if sql_logger:
-        sql_logger(comando)
+        colunas_str = ", ".join(colunas)
+        sql_logger(f"BULK COPY {tabela} ({colunas_str}) -- {len(dados)} registros")
 
+    # Um único lote BCP por chamada: ou todas as linhas entram, ou nenhuma.
     try:
-        cursor.executemany(comando, dados)
-        connection.commit()
+        connection._conn.bulk_copy(
+            tabela,
+            list(dados),
+            column_ids=list(posicoes),
+            batch_size=len(dados),
+            check_constraints=True,
+            fire_triggers=True,
+        )
+        if commit:
+            connection.commit()
     except Exception as erro:
-        connection.rollback()
-        raise RuntimeError(f"Erro ao inserir lote: {erro}") from erro
+        if commit:
+            connection.rollback()
+        raise RuntimeError(f"Erro ao copiar lote: {erro}") from erro
+
+
+def transacao_ativa(connection) -> bool:
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT XACT_STATE()")
+        resultado = cursor.fetchone()
+    except Exception:
+        return False
+    return bool(resultado) and resultado[0] == 1
 
 
 def listar_tabelas_mssql(connection) -> List[str]:
@@ -44,6 +145,27 @@ def listar_tabelas_mssql(connection) -> List[str]:
     return [linha[0] for linha in cursor.fetchall()]
 
 
+def estimar_registros_mssql(connection, tabelas: Iterable[str]) -> Dict[str, int]:
+    # Lê a contagem mantida em sys.partitions, sem varrer as tabelas. O valor
+    # pode divergir do COUNT(*) enquanto houver transações em andamento.
+    cursor = connection.cursor()
+    cursor.execute(
+        """
+        SELECT t.name, SUM(p.rows)
+        FROM sys.partitions AS p
+        INNER JOIN sys.tables AS t ON t.object_id = p.object_id
+        WHERE p.index_id IN (0, 1)
+        GROUP BY t.name
+        """
+    )
+    estimativas = {nome.casefold(): int(total) for nome, total in cursor.fetchall()}
+    return {
+        tabela: estimativas[tabela.casefold()]
+        for tabela in tabelas
+        if tabela.casefold() in estimativas
+    }
+
+
 def _executar_acao_constraint(
     connection, tabela: str, acao: str, sql_logger=None
 ) -> None:
@@ -84,10 +206,11 @@ def listar_triggers_ativas(connection) -> Sequence[Tuple[str, str]]:
     return cursor.fetchall()
 
 
-def listar_indices_ativos(connection) -> Sequence[Tuple[str, str]]:
-    cursor = connection.cursor()
-    cursor.execute(
-        """
+def listar_indices_ativos(
+    connection, tabela: Optional[str] = None
+) -> Sequence[Tuple[str, str]]:
+    # Só índices não clusterizados: desativar o clusterizado bloqueia a tabela.
+    consulta = """
         SELECT t.name AS table_name, i.name AS index_name
         FROM sys.indexes AS i
         INNER JOIN sys.tables AS t ON t.object_id = i.object_id
@@ -96,9 +219,13 @@ def listar_indices_ativos(connection) -> Sequence[Tuple[str, str]]:
           AND i.is_disabled = 0
           AND i.is_primary_key = 0
           AND i.is_unique_constraint = 0
-          AND i.type_desc <> 'HEAP'
+          AND i.type_desc = 'NONCLUSTERED'
         """
-    )
+    cursor = connection.cursor()
+    if tabela is None:
+        cursor.execute(consulta)
+    else:
+        cursor.execute(consulta + " AND t.name = %s AND i.is_unique = 0", (tabela,))
     return cursor.fetchall()
 
 
@@ -203,64 +330,49 @@ def obter_versao_mssql(connection) -> str:
     return resultado[0] if resultado else "Desconhecida"
 
 
-def executar_query_mssql(connection, query: str, sql_logger=None) -> List[Sequence]:
-    cursor = connection.cursor()
+def executar_query_mssql(
+    connection, query: str, sql_logger=None, cursor=None
+) -> List[Sequence]:
+    if cursor is None:
+        cursor = connection.cursor()
     if sql_logger:
         sql_logger(query)
     cursor.execute(query)
-    try:
-        resultados = cursor.fetchall()
-    except pymssql.ProgrammingError:
-        resultados = []
+    resultados = cursor.fetchall() if cursor.description is not None else []
     connection.commit()
     return resultados
 
 
-def listar_constraints_mssql(connection) -> Set[str]:
+_CATEGORIAS_METADATA = ("constraints", "indexes", "procedures", "triggers")
+
+
+def listar_todos_objetos_mssql(connection) -> Dict[str, FrozenSet[str]]:
     cursor = connection.cursor()
     cursor.execute(
         """
-        SELECT name
+        SELECT 'constraints' AS kind, name
         FROM sys.objects
         WHERE type IN ('C', 'F', 'PK', 'UQ', 'D')
           AND is_ms_shipped = 0
-        """
-    )
-    return {linha[0] for linha in cursor.fetchall() if linha[0]}
-
-
-def listar_indices_mssql(connection) -> Set[str]:
-    cursor = connection.cursor()
-    cursor.execute(
-        """
-        SELECT name
+        UNION ALL
+        SELECT 'indexes', name
         FROM sys.indexes
         WHERE name IS NOT NULL
           AND is_hypothetical = 0
-        """
-    )
-    return {linha[0] for linha in cursor.fetchall() if linha[0]}
-
-
-def listar_procedures_mssql(connection) -> Set[str]:
-    cursor = connection.cursor()
-    cursor.execute(
-        """
-        SELECT name
+        UNION ALL
+        SELECT 'procedures', name
         FROM sys.procedures
         WHERE is_ms_shipped = 0
-        """
-    )
-    return {linha[0] for linha in cursor.fetchall() if linha[0]}
-
-
-def listar_triggers_mssql(connection) -> Set[str]:
-    cursor = connection.cursor()
-    cursor.execute(
-        """
-        SELECT name
+        UNION ALL
+        SELECT 'triggers', name
         FROM sys.triggers
         WHERE is_ms_shipped = 0
         """
     )
-    return {linha[0] for linha in cursor.fetchall() if linha[0]}
+    objetos: Dict[str, Set[str]] = {
+        categoria: set() for categoria in _CATEGORIAS_METADATA
+    }
+    for categoria, nome in cursor.fetchall():
+        if nome:
+            objetos[categoria].add(nome)
+    return {categoria: frozenset(nomes) for categoria, nomes in objetos.items()}
@@ -1,20 +1,42 @@
+import concurrent.futures
+import datetime
+import decimal
+import functools
+import hashlib
+import atexit
+import json
 import logging
+import logging.handlers
+import math
+import queue
+import statistics
 import threading
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
+from contextlib import closing, contextmanager
 from dataclasses import dataclass
-from typing import Callable, Dict, Iterable, Optional, Sequence, Set, Tuple, List
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    FrozenSet,
+    Sequence,
+    Tuple,
+    List,
+)
 
 from db_firebird import (
     buscar_lotes_firebird,
     conectar_firebird,
     inserir_lote_firebird,
+    ler_lotes_firebird,
     limpar_tabela_firebird,
-    listar_constraints_firebird,
-    listar_indices_firebird,
-    listar_procedures_firebird,
     listar_tabelas_firebird,
-    listar_triggers_firebird,
+    listar_todos_objetos_firebird,
+    montar_insert_firebird,
+    possui_colunas_blob_firebird,
 )
 from db_mssql import (
     ativar_constraint,
@@ -22,6 +44,7 @@ from db_mssql import (
     ativar_indice,
     ativar_trigger,
     conectar_mssql,
+    copiar_lote_mssql,
     definir_identity_insert,
     desativar_constraints_tabelas,
     desativar_indice,
@@ -29,14 +52,14 @@ from db_mssql import (
     inserir_lote_mssql,
     limpar_tabela_destino,
     listar_constraints_desativadas,
-    listar_constraints_mssql,
     listar_indices_ativos,
-    listar_indices_mssql,
-    listar_procedures_mssql,
+    listar_posicoes_colunas_mssql,
     listar_tabelas_mssql,
+    listar_todos_objetos_mssql,
     listar_triggers_ativas,
-    listar_triggers_mssql,
     possui_coluna_identidade,
+    suporta_bulk_copy,
+    transacao_ativa,
 )
 
 SQLLogger = Optional[Callable[[str], None]]
@@ -50,22 +73,62 @@ class OperationCancelled(Exception):
     pass
 
 
+class BulkTransactionAborted(RuntimeError):
+    """Raised when a failed batch invalidated the whole bulk transaction."""
+
+    pass
+
+
 @dataclass
 class MigrationSummary:
     total_inseridos: int
     tempo_total: float
     constraints_pendentes: Sequence[Tuple[str, str]]
     comparacao_modelo: Dict[str, Dict[str, Sequence[str]]]
+    # Preenchido quando auto_chunk_size chegou a um tamanho diferente do inicial.
+    tamanho_lote_aprendido: Optional[int] = None
+
+
+def _cached(metodo: Callable) -> Callable:
+    nome = metodo.__name__
+
+    @functools.wraps(metodo)
+    def wrapper(self):
+        entrada = self._meta_cache.get(nome)
+        if entrada is not None and entrada[0] == self._cache_gen:
+            return entrada[1]
+        resultado = metodo(self)
+        self._meta_cache[nome] = (self._cache_gen, resultado)
+        return resultado
+
+    return wrapper
 
 
 class BaseDestinationHandler:
     supports_constraints = False
     supports_identity_insert = False
     supports_global_disable = False
+    supports_multi_values = False
 
     def __init__(self, connection, sql_logger: SQLLogger = None):
         self.connection = connection
         self.sql_logger = sql_logger
+        self.usar_bulk_copy = False
+        self.desativar_indices = False
+        self._transacao_em_lote = False
+        self._commit_a_cada = 0
+        self._lotes_pendentes = 0
+        self._meta_cache: Dict[str, Tuple[int, object]] = {}
+        self._cache_gen = 0
+        self._prepared: Dict[Tuple[str, Tuple[str, ...]], object] = {}
+        self._insert_cursor = None
+
+    def _invalidar_cache(self, *metodos: str) -> None:
+        if not metodos:
+            self._cache_gen += 1
+            return
+        for metodo in metodos:
+            self._meta_cache.pop(metodo, None)
 
     def list_tables(self) -> Sequence[str]:
         raise NotImplementedError
@@ -95,10 +158,36 @@ class BaseDestinationHandler:
         return None
 
     def after_inserts(self, tabela: str) -> None:
-        return None
+        self._descartar_preparados(tabela)
+
+    def _descartar_preparados(self, tabela: str) -> None:
+        for chave in [chave for chave in self._prepared if chave[0] == tabela]:
+            del self._prepared[chave]
+
+    @contextmanager
+    def bulk_transaction(self, commit_every: int = 0) -> Iterator[None]:
+        self._transacao_em_lote = True
+        self._commit_a_cada = max(0, int(commit_every))
+        self._lotes_pendentes = 0
+        try:
+            yield
+        except BaseException:
+            self.connection.rollback()
+            raise
+        else:
+            self.connection.commit()
+        finally:
+            self._transacao_em_lote = False
+            self._lotes_pendentes = 0
+
+    def _registrar_lote_em_transacao(self) -> None:
+        self._lotes_pendentes += 1
+        if self._commit_a_cada and self._lotes_pendentes >= self._commit_a_cada:
+            self.connection.commit()
+            self._lotes_pendentes = 0
 
     def insert_batch(
-        self, tabela: str, colunas: Sequence[str], dados: Iterable[Sequence]
+        self, tabela: str, colunas: Sequence[str], dados: Sequence[Tuple]
     ) -> None:
         raise NotImplementedError
 
@@ -106,11 +195,10 @@ class BaseDestinationHandler:
         cursor = self.connection.cursor()
         if self.sql_logger:
             self.sql_logger(comando)
+        self._invalidar_cache()
         cursor.execute(comando)
-        try:
+        if cursor.description is not None:
             cursor.fetchall()
-        except Exception:
-            pass
         self.connection.commit()
 
     def primary_key_columns(self, tabela: str) -> Sequence[str]:
@@ -121,7 +209,7 @@ class BaseDestinationHandler:
     ) -> Optional[object]:
         return None
 
-    def metadata(self) -> Dict[str, Set[str]]:
+    def metadata(self) -> Dict[str, FrozenSet[str]]:
         raise NotImplementedError
 
 
@@ -129,6 +217,7 @@ class MssqlDestinationHandler(BaseDestinationHandler):
     supports_constraints = True
     supports_identity_insert = True
     supports_global_disable = True
+    supports_multi_values = True
 
     def __init__(self, connection, sql_logger: SQLLogger = None):
         super().__init__(connection, sql_logger)
@@ -136,21 +225,26 @@ class MssqlDestinationHandler(BaseDestinationHandler):
         self._disabled_triggers: Dict[str, List[str]] = {}
         self._disabled_indexes: Dict[str, List[str]] = {}
         self._global_objects_disabled = False
+        self._colunas_bcp: Dict[Tuple[str, Tuple[str, ...]], Optional[List[int]]] = {}
 
+    @_cached
     def list_tables(self) -> Sequence[str]:
         return listar_tabelas_mssql(self.connection)
 
     def disable_constraints(self) -> None:
         tabelas = self.list_tables()
+        self._invalidar_cache("list_disabled_constraints")
         desativar_constraints_tabelas(self.connection, tabelas, self.sql_logger)
 
     def enable_constraints(self) -> None:
         tabelas = self.list_tables()
+        self._invalidar_cache("list_disabled_constraints")
         ativar_constraints_tabelas(self.connection, tabelas, self.sql_logger)
 
     def disable_all_objects(self) -> None:
         if self._global_objects_disabled:
             return
+        self._invalidar_cache("list_disabled_constraints")
 
         tabelas = self.list_tables()
         desativar_constraints_tabelas(self.connection, tabelas, self.sql_logger)
@@ -171,6 +265,7 @@ class MssqlDestinationHandler(BaseDestinationHandler):
     def enable_all_objects(self) -> None:
         if not self._global_objects_disabled:
             return
+        self._invalidar_cache("list_disabled_constraints")
 
         tabelas = self.list_tables()
         ativar_constraints_tabelas(self.connection, tabelas, self.sql_logger)
@@ -188,10 +283,12 @@ class MssqlDestinationHandler(BaseDestinationHandler):
         self._disabled_triggers.clear()
         self._global_objects_disabled = False
 
+    @_cached
     def list_disabled_constraints(self) -> Sequence[Tuple[str, str]]:
         return listar_constraints_desativadas(self.connection)
 
     def enable_specific_constraint(self, tabela: str, constraint: str) -> None:
+        self._invalidar_cache("list_disabled_constraints")
         ativar_constraint(self.connection, tabela, constraint, self.sql_logger)
 
     def clear_table(self, tabela: str) -> None:
@@ -202,14 +299,94 @@ class MssqlDestinationHandler(BaseDestinationHandler):
             definir_identity_insert(self.connection, tabela, True, self.sql_logger)
             self._identity_ativado[tabela] = True
 
+        if self.desativar_indices and not self._global_objects_disabled:
+            indices = [
+                indice for _, indice in listar_indices_ativos(self.connection, tabela)
+            ]
+            for indice in indices:
+                desativar_indice(self.connection, tabela, indice, self.sql_logger)
+            if indices:
+                self._disabled_indexes[tabela] = indices
+                self.connection.commit()
+
     def after_inserts(self, tabela: str) -> None:
-        if self._identity_ativado.pop(tabela, False):
-            definir_identity_insert(self.connection, tabela, False, self.sql_logger)
+        super().after_inserts(tabela)
+        for chave in [chave for chave in self._colunas_bcp if chave[0] == tabela]:
+            del self._colunas_bcp[chave]
+        try:
+            indices = []
+            if not self._global_objects_disabled:
+                indices = self._disabled_indexes.pop(tabela, [])
+            for indice in indices:
+                ativar_indice(self.connection, tabela, indice, self.sql_logger)
+            if indices:
+                self.connection.commit()
+        finally:
+            if self._identity_ativado.pop(tabela, False):
+                definir_identity_insert(
+                    self.connection, tabela, False, self.sql_logger
+                )
 
     def insert_batch(
-        self, tabela: str, colunas: Sequence[str], dados: Iterable[Sequence]
+        self, tabela: str, colunas: Sequence[str], dados: Sequence[Tuple]
     ) -> None:
-        inserir_lote_mssql(self.connection, tabela, colunas, dados, self.sql_logger)
+        if self._insert_cursor is None:
+            self._insert_cursor = self.connection.cursor()
+        try:
+            posicoes = self._posicoes_bulk_copy(tabela, colunas)
+            if posicoes is not None:
+                copiar_lote_mssql(
+                    self.connection,
+                    tabela,
+                    colunas,
+                    dados,
+                    posicoes,
+                    self.sql_logger,
+                    commit=not self._transacao_em_lote,
+                )
+            else:
+                inserir_lote_mssql(
+                    self.connection,
+                    tabela,
+                    colunas,
+                    dados,
+                    self.sql_logger,
+                    cursor=self._insert_cursor,
+                    comandos=self._prepared.setdefault((tabela, tuple(colunas)), {}),
+                    commit=not self._transacao_em_lote,
+                    linhas_por_insert=None if self.supports_multi_values else 1,
+                )
+        except Exception as erro:
+            if self._transacao_em_lote and not transacao_ativa(self.connection):
+                raise BulkTransactionAborted(
+                    f"Transação da tabela {tabela} abortada pelo servidor: {erro}"
+                ) from erro
+            raise
+        if self._transacao_em_lote:
+            self._registrar_lote_em_transacao()
+
+    def _posicoes_bulk_copy(
+        self, tabela: str, colunas: Sequence[str]
+    ) -> Optional[List[int]]:
+        # O bulk copy do pymssql não preserva valores de identidade
+        # (não há KEEPIDENTITY), então essas tabelas seguem pelo INSERT.
+        if (
+            not self.usar_bulk_copy
+            or self._identity_ativado.get(tabela)
+            or not suporta_bulk_copy(self.connection)
+        ):
+            return None
+
+        chave = (tabela, tuple(colunas))
+        if chave not in self._colunas_bcp:
+            posicoes = listar_posicoes_colunas_mssql(self.connection, tabela)
+            try:
+                self._colunas_bcp[chave] = [
+                    posicoes[coluna.casefold()] for coluna in colunas
+                ]
+            except KeyError:
+                self._colunas_bcp[chave] = None
+        return self._colunas_bcp[chave]
 
     def primary_key_columns(self, tabela: str) -> Sequence[str]:
         cursor = self.connection.cursor()
@@ -267,16 +444,13 @@ class MssqlDestinationHandler(BaseDestinationHandler):
 
         return None
 
-    def metadata(self) -> Dict[str, Set[str]]:
-        return {
-            "constraints": listar_constraints_mssql(self.connection),
-            "indexes": listar_indices_mssql(self.connection),
-            "procedures": listar_procedures_mssql(self.connection),
-            "triggers": listar_triggers_mssql(self.connection),
-        }
+    @_cached
+    def metadata(self) -> Dict[str, FrozenSet[str]]:
+        return listar_todos_objetos_mssql(self.connection)
 
 
 class FirebirdDestinationHandler(BaseDestinationHandler):
+    @_cached
     def list_tables(self) -> Sequence[str]:
         return listar_tabelas_firebird(self.connection)
 
@@ -284,29 +458,84 @@ class FirebirdDestinationHandler(BaseDestinationHandler):
         limpar_tabela_firebird(self.connection, tabela, self.sql_logger)
 
     def insert_batch(
-        self, tabela: str, colunas: Sequence[str], dados: Iterable[Sequence]
+        self, tabela: str, colunas: Sequence[str], dados: Sequence[Tuple]
     ) -> None:
-        inserir_lote_firebird(self.connection, tabela, colunas, dados, self.sql_logger)
-
-    def metadata(self) -> Dict[str, Set[str]]:
-        return {
-            "constraints": listar_constraints_firebird(self.connection),
-            "indexes": listar_indices_firebird(self.connection),
-            "procedures": listar_procedures_firebird(self.connection),
-            "triggers": listar_triggers_firebird(self.connection),
-        }
+        if self._insert_cursor is None:
+            self._insert_cursor = self.connection.cursor()
+        chave = (tabela, tuple(colunas))
+        comando = self._prepared.get(chave)
+        if comando is None:
+            comando = self._insert_cursor.prep(montar_insert_firebird(tabela, colunas))
+            self._prepared[chave] = comando
+
+        inserir_lote_firebird(
+            self.connection,
+            tabela,
+            colunas,
+            dados,
+            self.sql_logger,
+            commit=not self._transacao_em_lote,
+            cursor=self._insert_cursor,
+            comando=comando,
+        )
+        if self._transacao_em_lote:
+            self._registrar_lote_em_transacao()
+
+    @_cached
+    def metadata(self) -> Dict[str, FrozenSet[str]]:
+        return listar_todos_objetos_firebird(self.connection)
+
+
+_INTERVALO_LOG_PROGRESSO = 1.0
+_LOGGER_CONFIGURADO = False
+_LOGGER_LOCK = threading.Lock()
 
 
 def configurar_logger(log_path: str) -> None:
-    logging.basicConfig(
-        filename=log_path,
-        level=logging.INFO,
-        format="%(asctime)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
+    global _LOGGER_CONFIGURADO
+    if _LOGGER_CONFIGURADO:
+        return
+    with _LOGGER_LOCK:
+        if _LOGGER_CONFIGURADO:
+            return
+        _LOGGER_CONFIGURADO = True
+        _instalar_logger(log_path)
+
+
+def _instalar_logger(log_path: str) -> None:
+    raiz = logging.getLogger()
+    if raiz.handlers:
+        return
+
+    # A escrita em disco fica numa thread própria para não travar os lotes.
+    arquivo = logging.FileHandler(log_path)
+    arquivo.setFormatter(
+        logging.Formatter("%(asctime)s | %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
     )
+    fila: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(fila, arquivo)
+    listener.start()
+    atexit.register(listener.stop)
+
+    raiz.addHandler(logging.handlers.QueueHandler(fila))
+    raiz.setLevel(logging.INFO)
 
 
 _TEXT_CODECS = ("utf-8", "latin-1", "cp1252")
+# Valores que a sanitização devolve sem alteração; conferir o tipo exato evita
+# a cadeia de isinstance e a inspeção de BlobReader em cada célula.
+_TIPOS_SEM_TRATAMENTO = frozenset(
+    {
+        type(None),
+        bool,
+        int,
+        float,
+        decimal.Decimal,
+        datetime.date,
+        datetime.datetime,
+        datetime.time,
+    }
+)
 
 
 def _registrar_evento(
@@ -326,6 +555,9 @@ def _converter_bytes_para_texto(
     log_fn: Optional[LogFunction] = None,
     origem: str = "bytes",
 ) -> str:
+    # ASCII é UTF-8 válido e reversível: dispensa a tentativa e a recodificação.
+    if valor.isascii():
+        return valor.decode("ascii")
     for codec in _TEXT_CODECS:
         try:
             texto = valor.decode(codec)
@@ -363,6 +595,113 @@ def _converter_bytes_para_texto(
     return texto
 
 
+_FIM_LEITURA = object()
+_COMMIT_A_CADA_PADRAO = 10
+
+
+def _ler_lotes_em_segundo_plano(
+    lotes: Iterable[Sequence], max_pendentes: int = 2
+) -> Iterator[Sequence]:
+    fila: "queue.Queue[Tuple[object, Optional[BaseException]]]" = queue.Queue(
+        maxsize=max(1, max_pendentes)
+    )
+    parar = threading.Event()
+
+    def entregar(item: Tuple[object, Optional[BaseException]]) -> bool:
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produtor() -> None:
+        try:
+            for lote in lotes:
+                if not entregar((lote, None)):
+                    return
+        except BaseException as erro:
+            entregar((None, erro))
+            return
+        entregar((_FIM_LEITURA, None))
+
+    leitor = threading.Thread(
+        target=produtor, name="dump-leitura-lotes", daemon=True
+    )
+    leitor.start()
+    try:
+        while True:
+            lote, erro = fila.get()
+            if erro is not None:
+                raise erro
+            if lote is _FIM_LEITURA:
+                return
+            yield lote
+    finally:
+        parar.set()
+        leitor.join()
+
+
+class _AjusteTamanhoLote:
+    def __init__(
+        self,
+        tamanho_inicial: int,
+        max_medicoes: int = 6,
+        tamanho_maximo: int = 100_000,
+    ) -> None:
+        self.tamanho = tamanho_inicial
+        self.congelado = False
+        self.max_medicoes = max_medicoes
+        self.tamanho_maximo = tamanho_maximo
+        self._medicoes = 0
+        self._taxa_media: Optional[float] = None
+        self._taxa_referencia: Optional[float] = None
+        self._taxas: "deque[float]" = deque(maxlen=3)
+
+    def _instavel(self) -> bool:
+        if len(self._taxas) < self._taxas.maxlen:
+            return False
+        media = statistics.fmean(self._taxas)
+        return media > 0 and statistics.pstdev(self._taxas) / media > 0.5
+
+    def registrar(self, linhas: int, duracao: float) -> bool:
+        # Lotes lidos antes do último ajuste (ou o lote final, menor) não
+        # medem o tamanho atual e são ignorados.
+        if self.congelado or linhas != self.tamanho or duracao <= 0:
+            return False
+
+        self._medicoes += 1
+        taxa = linhas / duracao
+        self._taxas.append(taxa)
+        if self._taxa_media is None:
+            self._taxa_media = taxa
+        else:
+            self._taxa_media = 0.7 * self._taxa_media + 0.3 * taxa
+
+        if self._taxa_referencia is None:
+            return self._dobrar()
+
+        ganho = self._taxa_media / self._taxa_referencia - 1
+        if ganho > 0.10 and not self._instavel():
+            return self._dobrar()
+        if ganho < 0:
+            self.tamanho = max(1, self.tamanho // 2)
+            self.congelado = True
+            return True
+        if ganho < 0.05 or self._instavel() or self._medicoes >= self.max_medicoes:
+            self.congelado = True
+        return False
+
+    def _dobrar(self) -> bool:
+        if self._medicoes >= self.max_medicoes or self.tamanho >= self.tamanho_maximo:
+            self.congelado = True
+            return False
+        self._taxa_referencia = self._taxa_media
+        self.tamanho = min(self.tamanho * 2, self.tamanho_maximo)
+        return True
+
+
 def _normalizar_valor_para_comparacao(valor: object) -> object:
     if isinstance(valor, bytes):
         return _converter_bytes_para_texto(valor)
@@ -468,6 +807,8 @@ def _sanear_string(
     if "'" in valor:
         _registrar_evento(estatisticas, coluna, "string:aspas-simples")
 
+    if valor.isascii():
+        return valor
     try:
         valor.encode("utf-8")
     except UnicodeEncodeError as erro:
@@ -550,6 +891,10 @@ def sanitizar_lote(
     for indice_linha, linha in enumerate(lote, start=1):
         nova_linha: List[object] = []
         for indice_coluna, valor in enumerate(linha):
+            if type(valor) in _TIPOS_SEM_TRATAMENTO:
+                nova_linha.append(valor)
+                continue
+
             if isinstance(valor, bytes):
                 coluna = colunas[indice_coluna]
                 texto = _converter_bytes_para_texto(
@@ -714,13 +1059,15 @@ def _inserir_registros_com_intervencao(
     registros: Sequence[Sequence[object]],
     registros_originais: Sequence[Sequence[object]],
     log_fn: LogFunction,
+    primeira_linha: int = 1,
 ) -> int:
     inseridos = 0
-    for linha_indice, registro in enumerate(registros, start=1):
+    for posicao, registro in enumerate(registros):
+        linha_indice = primeira_linha + posicao
         valores = tuple(registro)
         original = (
-            tuple(registros_originais[linha_indice - 1])
-            if linha_indice - 1 < len(registros_originais)
+            tuple(registros_originais[posicao])
+            if posicao < len(registros_originais)
             else valores
         )
         while True:
@@ -735,6 +1082,8 @@ def _inserir_registros_com_intervencao(
                     extra={"tabela": tabela, "linha": linha_indice},
                 )
                 break
+            except BulkTransactionAborted:
+                raise
             except Exception as erro:
                 mensagem = (
                     f"[ERRO] Falha ao inserir registro {linha_indice}: {erro}. "
@@ -775,6 +1124,50 @@ def _inserir_registros_com_intervencao(
     return inseridos
 
 
+def _inserir_com_bisecao(
+    destino_handler: BaseDestinationHandler,
+    tabela: str,
+    colunas: Sequence[str],
+    registros: Sequence[Sequence[object]],
+    registros_originais: Sequence[Sequence[object]],
+    log_fn: LogFunction,
+    primeira_linha: int = 1,
+) -> int:
+    if len(registros) <= 1:
+        return _inserir_registros_com_intervencao(
+            destino_handler,
+            tabela,
+            colunas,
+            registros,
+            registros_originais,
+            log_fn,
+            primeira_linha,
+        )
+
+    meio = len(registros) // 2
+    inseridos = 0
+    for inicio, fim in ((0, meio), (meio, len(registros))):
+        parte = registros[inicio:fim]
+        originais = registros_originais[inicio:fim]
+        try:
+            destino_handler.insert_batch(tabela, colunas, parte)
+        except BulkTransactionAborted:
+            raise
+        except Exception:
+            inseridos += _inserir_com_bisecao(
+                destino_handler,
+                tabela,
+                colunas,
+                parte,
+                originais,
+                log_fn,
+                primeira_linha + inicio,
+            )
+        else:
+            inseridos += len(parte)
+    return inseridos
+
+
 def _erro_indica_duplicidade(descricao: str) -> bool:
     texto = descricao.lower()
     return "duplicate" in texto or "duplic" in texto or "primary key" in texto
@@ -798,7 +1191,114 @@ def _conectar_por_tipo(tipo: str, parametros: Dict[str, str]):
     raise ValueError(f"Tipo de banco não suportado: {tipo}")
 
 
-def _obter_metadata_por_tipo(tipo: str, connection) -> Dict[str, Set[str]]:
+_POOLS: Dict[Tuple[str, str], "queue.Queue"] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _chave_pool(tipo: str, parametros: Dict[str, str]) -> Tuple[str, str]:
+    serializado = json.dumps(parametros, sort_keys=True, default=str)
+    return tipo, hashlib.sha1(serializado.encode("utf-8")).hexdigest()
+
+
+def _obter_pool(tipo: str, parametros: Dict[str, str], tamanho: int) -> "queue.Queue":
+    chave = _chave_pool(tipo, parametros)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(chave)
+        if pool is None:
+            pool = queue.Queue(maxsize=max(1, tamanho))
+            _POOLS[chave] = pool
+        return pool
+
+
+_OCIOSIDADE_MAXIMA_POOL = 60.0
+_CONSULTAS_PING = {
+    "firebird": "SELECT 1 FROM RDB$DATABASE",
+    "mssql": "SELECT 1",
+}
+
+
+def _conexao_ativa(tipo: str, connection) -> bool:
+    try:
+        cursor = connection.cursor()
+        cursor.execute(_CONSULTAS_PING.get(tipo, "SELECT 1"))
+        cursor.fetchone()
+    except Exception:
+        return False
+    return True
+
+
+def _obter_conexao(
+    tipo: str,
+    parametros: Dict[str, str],
+    tamanho_pool: int,
+    verificar: bool = False,
+):
+    pool = _obter_pool(tipo, parametros, tamanho_pool)
+    while True:
+        try:
+            connection, devolvida_em = pool.get_nowait()
+        except queue.Empty:
+            return _conectar_por_tipo(tipo, parametros)
+        # Só confere conexões paradas há algum tempo; o servidor pode tê-las
+        # encerrado. As devolvidas há pouco seguem sem ida e volta extra.
+        ociosa = time.monotonic() - devolvida_em >= _OCIOSIDADE_MAXIMA_POOL
+        if not (verificar or ociosa) or _conexao_ativa(tipo, connection):
+            return connection
+        _fechar_conexao(connection)
+
+
+def _fechar_conexao(connection) -> None:
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def _devolver_conexao(
+    tipo: str, parametros: Dict[str, str], tamanho_pool: int, connection
+) -> None:
+    # Uma conexão com transação pendente ou quebrada não volta para o pool.
+    try:
+        connection.rollback()
+    except Exception:
+        _fechar_conexao(connection)
+        return
+
+    pool = _obter_pool(tipo, parametros, tamanho_pool)
+    try:
+        pool.put_nowait((connection, time.monotonic()))
+    except queue.Full:
+        _fechar_conexao(connection)
+
+
+@contextmanager
+def emprestar_conexao(
+    tipo: str,
+    parametros: Dict[str, str],
+    tamanho_pool: int = 1,
+    verificar: bool = False,
+) -> Iterator:
+    connection = _obter_conexao(tipo, parametros, tamanho_pool, verificar)
+    try:
+        yield connection
+    finally:
+        _devolver_conexao(tipo, parametros, tamanho_pool, connection)
+
+
+def fechar_pools() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        while True:
+            try:
+                connection, _devolvida_em = pool.get_nowait()
+            except queue.Empty:
+                break
+            _fechar_conexao(connection)
+
+
+def _obter_metadata_por_tipo(tipo: str, connection) -> Dict[str, FrozenSet[str]]:
     handler = _criar_handler_destino(tipo, connection, None)
     return handler.metadata()
 
@@ -818,25 +1318,28 @@ def _comparar_modelo(
         raise ValueError("Configuração do banco modelo não encontrada em config.json.")
 
     modelo_cfg = config["model"]
-    con_modelo = _conectar_por_tipo(modelo_cfg["type"], modelo_cfg["database"])
+    con_modelo = _obter_conexao(modelo_cfg["type"], modelo_cfg["database"], 1)
     try:
         metadata_modelo = _obter_metadata_por_tipo(modelo_cfg["type"], con_modelo)
     finally:
-        try:
-            con_modelo.close()
-        except Exception:
-            pass
+        _devolver_conexao(modelo_cfg["type"], modelo_cfg["database"], 1, con_modelo)
 
     metadata_destino = destino_handler.metadata()
 
     comparacao: Dict[str, Dict[str, Sequence[str]]] = {}
-    chaves = set(metadata_modelo.keys()) | set(metadata_destino.keys())
-    for chave in sorted(chaves):
-        itens_modelo = metadata_modelo.get(chave, set())
-        itens_destino = metadata_destino.get(chave, set())
+    vazio: FrozenSet[str] = frozenset()
+    for chave in sorted(metadata_modelo.keys() | metadata_destino.keys()):
+        itens_modelo = metadata_modelo.get(chave, vazio)
+        itens_destino = metadata_destino.get(chave, vazio)
+        if itens_modelo == itens_destino:
+            comparacao[chave] = {
+                "faltantes_no_destino": [],
+                "excedentes_no_destino": [],
+            }
+            continue
         comparacao[chave] = {
-            "faltantes_no_destino": sorted(itens_modelo - itens_destino),
-            "excedentes_no_destino": sorted(itens_destino - itens_modelo),
+            "faltantes_no_destino": sorted(itens_modelo.difference(itens_destino)),
+            "excedentes_no_destino": sorted(itens_destino.difference(itens_modelo)),
         }
     return comparacao
 
@@ -853,6 +1356,20 @@ def executar_dump(
     limpar_destino: bool = True,
 ) -> MigrationSummary:
     chunk_size = config["settings"]["chunk_size"]
+    tamanho_pool = int(config["settings"].get("worker_count", 1))
+    # 0 carrega cada tabela numa única transação; o padrão limita o tamanho do
+    # log de transações (MSSQL) e do undo (Firebird).
+    commit_every = int(
+        config["settings"].get("commit_every_n_batches", _COMMIT_A_CADA_PADRAO)
+    )
+    prefetch_batches = int(config["settings"].get("prefetch_batches", 2))
+    streaming_fetch = bool(config["settings"].get("streaming_fetch", True))
+    contar_registros = bool(config["settings"].get("count_rows", False))
+    ajuste_lote = (
+        _AjusteTamanhoLote(chunk_size)
+        if config["settings"].get("auto_chunk_size", False)
+        else None
+    )
     log_path = config["settings"]["log_path"]
     configurar_logger(log_path)
 
@@ -875,30 +1392,52 @@ def executar_dump(
 
     if con_origem is None:
         log_fn(f"🔌 Conectando ao banco de origem ({origem_cfg['type']})...")
-        con_origem = _conectar_por_tipo(origem_cfg["type"], origem_cfg["database"])
+        con_origem = _obter_conexao(
+            origem_cfg["type"], origem_cfg["database"], tamanho_pool
+        )
 
     if con_destino is None:
         log_fn(f"🔌 Conectando ao banco de destino ({destino_cfg['type']})...")
-        con_destino = _conectar_por_tipo(destino_cfg["type"], destino_cfg["database"])
+        con_destino = _obter_conexao(
+            destino_cfg["type"], destino_cfg["database"], tamanho_pool
+        )
 
     destino_handler = _criar_handler_destino(
         destino_cfg["type"], con_destino, sql_logger
     )
+    destino_handler.usar_bulk_copy = bool(
+        config["settings"].get("mssql_bulk_copy", False)
+    )
+    destino_handler.desativar_indices = bool(
+        config["settings"].get("drop_indexes_during_load", True)
+    )
 
+    # No modo streaming a mesma consulta fornece as colunas e os lotes.
     cursor_origem = con_origem.cursor()
-    cursor_origem.execute(f"SELECT FIRST 1 * FROM {tabela}")
+    if streaming_fetch:
+        cursor_origem.execute(f"SELECT * FROM {tabela}")
+    else:
+        cursor_origem.execute(f"SELECT FIRST 0 * FROM {tabela}")
     colunas = [descricao[0] for descricao in cursor_origem.description]
 
-    cursor_origem.execute(f"SELECT COUNT(*) FROM {tabela}")
-    total_registros = cursor_origem.fetchone()[0]
-    total_lotes = (total_registros // chunk_size) + (
-        1 if total_registros % chunk_size > 0 else 0
-    )
+    # COUNT(*) percorre a tabela inteira no Firebird; só serve para o progresso.
+    total_registros: Optional[int] = None
+    total_lotes: Optional[int] = None
+    if contar_registros:
+        cursor_contagem = con_origem.cursor()
+        cursor_contagem.execute(f"SELECT COUNT(*) FROM {tabela}")
+        total_registros = cursor_contagem.fetchone()[0]
+        total_lotes = (total_registros // chunk_size) + (
+            1 if total_registros % chunk_size > 0 else 0
+        )
 
-    log_fn(f"📊 Total de registros a migrar: {total_registros}")
-    log_fn(f"📦 Iniciando exportação em {total_lotes} lotes...")
+        log_fn(f"📊 Total de registros a migrar: {total_registros}")
+        log_fn(f"📦 Iniciando exportação em {total_lotes} lotes...")
+    else:
+        log_fn("📦 Iniciando exportação em lotes...")
 
     start_time = time.time()
+    ultimo_log_progresso = 0.0
     offset = 0
     total_inseridos = 0
 
@@ -924,49 +1463,123 @@ def executar_dump(
 
             destino_handler.before_inserts(tabela)
 
-            for indice, lote in enumerate(
-                buscar_lotes_firebird(con_origem, tabela, chunk_size, offset), start=1
+            tamanho_lote = (lambda: ajuste_lote.tamanho) if ajuste_lote else None
+            if streaming_fetch:
+                lotes = ler_lotes_firebird(
+                    con_origem,
+                    tabela,
+                    chunk_size,
+                    tamanho_lote=tamanho_lote,
+                    cursor=cursor_origem,
+                )
+            else:
+                lotes = buscar_lotes_firebird(
+                    con_origem,
+                    tabela,
+                    chunk_size,
+                    offset,
+                    tamanho_lote,
+                    total=total_registros,
+                )
+            if prefetch_batches > 0 and possui_colunas_blob_firebird(
+                con_origem, tabela
             ):
-                if cancel_event and cancel_event.is_set():
-                    raise OperationCancelled("Processo cancelado pelo usuário.")
-                registros_brutos = [tuple(linha) for linha in lote]
-                registros_lote = sanitizar_lote(registros_brutos, colunas, log_fn)
-                try:
-                    destino_handler.insert_batch(tabela, colunas, registros_lote)
-                    offset += chunk_size
-                    total_inseridos += len(registros_lote)
-                    log_fn(
-                        f"✅ Lote {indice}/{total_lotes} exportado ({len(registros_lote)} registros)"
-                    )
-                    logging.info(
-                        f"Tabela: {tabela} | Lote {indice} | {len(registros_lote)} registros transferidos"
-                    )
-                except Exception as erro_lote:
-                    mensagem = (
-                        f"[ERRO] Falha ao inserir lote {indice}: {erro_lote}. "
-                        "Tentando inserir registros individualmente."
-                    )
-                    log_fn(mensagem)
-                    logging.error(mensagem)
-                    inseridos = _inserir_registros_com_intervencao(
-                        destino_handler,
-                        tabela,
-                        colunas,
-                        registros_lote,
-                        registros_brutos,
-                        log_fn,
-                    )
-                    total_inseridos += inseridos
-                    offset += chunk_size
-                    log_fn(
-                        f"✅ Lote {indice}/{total_lotes} concluído com intervenção manual ({inseridos} registros)."
-                    )
-                    logging.info(
-                        f"Tabela: {tabela} | Lote {indice} concluído após intervenção manual"
+                # BlobReaders são lidos na sanitização, nesta thread; com a
+                # leitura antecipada a conexão de origem seria usada por duas
+                # threads ao mesmo tempo.
+                log_fn(
+                    f"ℹ️ Tabela '{tabela}' possui colunas BLOB; leitura antecipada "
+                    "desativada."
+                )
+            elif prefetch_batches > 0:
+                lotes = _ler_lotes_em_segundo_plano(lotes, prefetch_batches)
+
+            # closing() encerra a leitura (e junta a thread de leitura
+            # antecipada) também em erro ou cancelamento, antes de a conexão de
+            # origem voltar ao pool.
+            with closing(lotes), destino_handler.bulk_transaction(commit_every):
+                for indice, lote in enumerate(lotes, start=1):
+                    if cancel_event and cancel_event.is_set():
+                        raise OperationCancelled(
+                            "Processo cancelado pelo usuário."
+                        )
+                    registros_brutos = [tuple(linha) for linha in lote]
+                    registros_lote = sanitizar_lote(
+                        registros_brutos, colunas, log_fn
                     )
+                    try:
+                        inicio_lote = time.perf_counter()
+                        destino_handler.insert_batch(
+                            tabela, colunas, registros_lote
+                        )
+                        offset += len(lote)
+                        total_inseridos += len(registros_lote)
+                        if ajuste_lote and ajuste_lote.registrar(
+                            len(lote), time.perf_counter() - inicio_lote
+                        ):
+                            if total_registros is not None:
+                                total_lotes = indice + math.ceil(
+                                    max(total_registros - offset, 0)
+                                    / ajuste_lote.tamanho
+                                )
+                            log_fn(
+                                f"📐 Tamanho do lote ajustado para {ajuste_lote.tamanho} registros."
+                            )
+                        agora = time.monotonic()
+                        if agora - ultimo_log_progresso > _INTERVALO_LOG_PROGRESSO or (
+                            total_lotes is not None
+                            and (
+                                indice >= total_lotes
+                                or indice % max(1, total_lotes // 100) == 0
+                            )
+                        ):
+                            ultimo_log_progresso = agora
+                            log_fn(
+                                f"✅ Lote {indice}/{total_lotes or '?'} exportado ({len(registros_lote)} registros)"
+                            )
+                        logging.info(
+                            "Tabela: %s | Lote %d | %d registros transferidos",
+                            tabela,
+                            indice,
+                            len(registros_lote),
+                        )
+                    except BulkTransactionAborted:
+                        raise
+                    except Exception as erro_lote:
+                        mensagem = (
+                            f"[ERRO] Falha ao inserir lote {indice}: {erro_lote}. "
+                            "Dividindo o lote para isolar os registros com falha."
+                        )
+                        log_fn(mensagem)
+                        logging.error(mensagem)
+                        inseridos = _inserir_com_bisecao(
+                            destino_handler,
+                            tabela,
+                            colunas,
+                            registros_lote,
+                            registros_brutos,
+                            log_fn,
+                        )
+                        total_inseridos += inseridos
+                        offset += len(lote)
+                        log_fn(
+                            f"✅ Lote {indice}/{total_lotes or '?'} concluído com intervenção manual ({inseridos} registros)."
+                        )
+                        logging.info(
+                            f"Tabela: {tabela} | Lote {indice} concluído após intervenção manual"
+                        )
         finally:
             destino_handler.after_inserts(tabela)
 
+            # O valor aprendido vai no resumo; outras tabelas podem estar usando
+            # o mesmo config em paralelo.
+            tamanho_lote_aprendido: Optional[int] = None
+            if ajuste_lote and ajuste_lote.tamanho != chunk_size:
+                tamanho_lote_aprendido = ajuste_lote.tamanho
+                logging.info(
+                    f"Tabela: {tabela} | Tamanho de lote aprendido: {ajuste_lote.tamanho}"
+                )
+
             constraints_pendentes: Sequence[Tuple[str, str]] = []
             if gerenciar_constraints and destino_handler.supports_constraints:
                 try:
@@ -1005,6 +1618,7 @@ def executar_dump(
                     tempo_total=tempo_total,
                     constraints_pendentes=constraints_pendentes,
                     comparacao_modelo=comparacao_modelo,
+                    tamanho_lote_aprendido=tamanho_lote_aprendido,
                 )
     except OperationCancelled:
         cancelado = True
@@ -1013,15 +1627,13 @@ def executar_dump(
         raise
     finally:
         if fechar_destino and con_destino:
-            try:
-                con_destino.close()
-            except Exception:
-                pass
+            _devolver_conexao(
+                destino_cfg["type"], destino_cfg["database"], tamanho_pool, con_destino
+            )
         if fechar_origem and con_origem:
-            try:
-                con_origem.close()
-            except Exception:
-                pass
+            _devolver_conexao(
+                origem_cfg["type"], origem_cfg["database"], tamanho_pool, con_origem
+            )
 
     if resumo is None:
         raise RuntimeError(
@@ -1029,3 +1641,28 @@ def executar_dump(
         )
 
     return resumo
+
+
+def executar_dump_multi(
+    tabelas: Sequence[str],
+    config: Dict,
+    max_workers: Optional[int] = None,
+    **kwargs,
+) -> Dict[str, MigrationSummary]:
+    if max_workers is None:
+        max_workers = int(config["settings"].get("worker_count", 1))
+    max_workers = max(1, min(max_workers, len(tabelas) or 1))
+
+    if "connections" in kwargs:
+        # Uma conexão DB-API não pode ser usada por duas threads ao mesmo tempo.
+        raise ValueError("Cada trabalhador obtém as próprias conexões do pool.")
+
+    resumos: Dict[str, MigrationSummary] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futuros = {
+            executor.submit(executar_dump, tabela, config, None, **kwargs): tabela
+            for tabela in tabelas
+        }
+        for futuro in concurrent.futures.as_completed(futuros):
+            resumos[futuros[futuro]] = futuro.result()
+    return resumos
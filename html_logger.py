@@ -2,23 +2,41 @@
 
 from __future__ import annotations
 
+import bisect
+import functools
 import html
 import re
+import shutil
+import string
 import threading
-from dataclasses import dataclass
+import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Callable, Dict, Optional, Sequence, Set, List
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
 
 
 LogFunction = Callable[[str], None]
 
 
+_NOME_INVALIDO_RE = re.compile(r"[^0-9A-Za-z_-]+")
+_TABELA_ESCAPE = str.maketrans(
+    {
+        "&": "&amp;",
+        "<": "&lt;",
+        ">": "&gt;",
+        '"': "&quot;",
+        "'": "&#x27;",
+        "\n": "<br/>",
+    }
+)
+
+
 def _sanitize_name(nome: str) -> str:
     nome = nome.strip()
     if not nome:
         return "Banco"
-    normalizado = re.sub(r"[^0-9A-Za-z_-]+", "_", nome)
+    normalizado = _NOME_INVALIDO_RE.sub("_", nome)
     return normalizado or "Banco"
 
 
@@ -56,18 +74,26 @@ def _formatar_duracao(segundos: Optional[float]) -> str:
     return f"{segundos_restantes:.2f}s"
 
 
+_ERROR_RE = re.compile(r"\[erro\]|⛔|❌", re.IGNORECASE)
+_WARN_RE = re.compile(r"⚠️|\[aviso\]|\[warn", re.IGNORECASE)
+
+
 def _inferir_nivel(mensagem: str) -> str:
-    minusculo = mensagem.lower()
-    if "[erro]" in minusculo or "⛔" in mensagem or "❌" in mensagem:
+    if _ERROR_RE.search(mensagem):
         return "error"
-    if "⚠️" in mensagem or "[aviso]" in minusculo or "[warn" in minusculo:
+    if _WARN_RE.search(mensagem):
         return "warning"
     return "info"
 
 
+@functools.lru_cache(maxsize=None)
+def _abrir_entrada(nivel: str) -> str:
+    # Poucos níveis distintos: o início de cada <li> é montado uma vez por nível.
+    return f'<li class="log-entry {html.escape(nivel)}"><span class="timestamp">'
+
+
 def _escape_message(mensagem: str) -> str:
-    texto = html.escape(mensagem)
-    return texto.replace("\n", "<br/>")
+    return mensagem.translate(_TABELA_ESCAPE)
 
 
 def _resolver_diretorio(base_path: Path) -> Path:
@@ -85,41 +111,139 @@ def obter_tamanho_banco_firebird(caminho: Optional[str]) -> Optional[int]:
         return None
 
 
-def obter_tamanho_banco_destino(tipo: str, connection) -> Optional[int]:
+def _consultar_tamanho_mssql(
+    connection, consulta: str, parametros: Tuple = ()
+) -> Optional[int]:
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        if parametros:
+            cursor.execute(consulta, parametros)
+        else:
+            cursor.execute(consulta)
+        resultado = cursor.fetchone()
+    except Exception:
+        return None
+    finally:
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+    if not resultado or resultado[0] is None:
+        return None
+    try:
+        return int(resultado[0])
+    except (TypeError, ValueError):
+        return None
+
+
+def obter_tamanho_banco_destino(
+    tipo: str, connection, nome_banco: Optional[str] = None
+) -> Optional[int]:
     if connection is None:
         return None
-    tipo_normalizado = tipo.lower()
-    if tipo_normalizado == "mssql":
-        cursor = None
-        try:
-            cursor = connection.cursor()
-            cursor.execute("SELECT SUM(size) * 8 * 1024 FROM sys.database_files")
-            resultado = cursor.fetchone()
-        except Exception:
-            return None
-        finally:
-            if cursor is not None:
-                try:
-                    cursor.close()
-                except Exception:
-                    pass
-        if not resultado:
-            return None
-        valor = resultado[0]
-        if valor is None:
-            return None
-        try:
-            return int(valor)
-        except (TypeError, ValueError):
-            return None
-    return None
-
-
-@dataclass
-class _LogEntry:
-    instante: datetime
-    nivel: str
-    mensagem: str
+    if tipo.lower() != "mssql":
+        return None
+    # sys.master_files filtrado pelo nome não depende do banco atual da conexão.
+    consulta = (
+        "SELECT CAST(SUM(size) AS BIGINT) * 8 * 1024 FROM sys.master_files "
+        "WHERE database_id = "
+    )
+    if nome_banco:
+        tamanho = _consultar_tamanho_mssql(
+            connection, consulta + "DB_ID(%s)", (nome_banco,)
+        )
+    else:
+        tamanho = _consultar_tamanho_mssql(connection, consulta + "DB_ID()")
+    if tamanho is not None:
+        return tamanho
+    # Sem VIEW ANY DEFINITION, sys.master_files volta vazio; sys.database_files
+    # só exige acesso ao banco atual, que é o destino da conexão.
+    return _consultar_tamanho_mssql(
+        connection,
+        "SELECT CAST(SUM(size) AS BIGINT) * 8 * 1024 FROM sys.database_files",
+    )
+
+
+_CABECALHO_HTML = string.Template(
+    """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8"/>
+<title>Relatório de Migração - $nome</title>
+<style>
+body { font-family: Arial, sans-serif; background: #f7f9fc; color: #263238; margin: 0; padding: 20px; }
+header { background: #1E88E5; color: white; padding: 20px; border-radius: 8px; }
+.summary { display: grid; grid-template-columns: repeat(auto-fit, minmax(220px, 1fr)); gap: 16px; margin: 20px 0; }
+.card { background: white; border-radius: 8px; padding: 16px; box-shadow: 0 2px 6px rgba(0,0,0,0.08); }
+.card h3 { margin-top: 0; font-size: 1.05rem; color: #546E7A; }
+.card p { margin: 0; font-size: 1.2rem; font-weight: bold; }
+section { margin-bottom: 32px; }
+section h2 { color: #1E88E5; }
+.log-entries { list-style: none; padding: 0; margin: 0; background: white; border-radius: 8px; box-shadow: 0 2px 6px rgba(0,0,0,0.08); }
+.log-entry { display: flex; gap: 16px; padding: 12px 16px; border-bottom: 1px solid #ECEFF1; align-items: baseline; }
+.log-entry:last-child { border-bottom: none; }
+.log-entry.error { color: #C62828; font-weight: bold; }
+.log-entry.warning { color: #EF6C00; }
+.timestamp { min-width: 80px; font-weight: bold; color: #455A64; }
+.comparison { width: 100%; border-collapse: collapse; background: white; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 6px rgba(0,0,0,0.08); }
+.comparison th, .comparison td { padding: 12px 16px; border-bottom: 1px solid #ECEFF1; text-align: left; }
+.comparison th { background: #E3F2FD; color: #1E88E5; font-size: 0.95rem; text-transform: uppercase; }
+.comparison tr:last-child td { border-bottom: none; }
+.empty { font-style: italic; color: #78909C; }
+</style>
+</head>
+<body>
+<header>
+  <h1>Relatório de Migração - $nome</h1>
+  <p>Gerado em $gerado_em</p>
+</header>
+<section>
+  <h2>Resumo</h2>
+    <div class="summary">
+      <div class="card">
+        <h3>Tamanho do banco FDB original</h3>
+        <p>$tamanho_origem</p>
+      </div>
+      <div class="card">
+        <h3>Tamanho do banco SQL final</h3>
+        <p>$tamanho_destino</p>
+      </div>
+      <div class="card">
+        <h3>Tempo total da migração</h3>
+        <p>$duracao</p>
+      </div>
+    </div>
+</section>
+<section>
+  <h2>Logs da Migração</h2>
+  <ul class="log-entries">
+    """
+)
+_RODAPE_HTML = string.Template(
+    """
+  </ul>
+</section>
+<section>
+  <h2>Relatório comparativo pós-migração</h2>
+  $comparacao
+</section>
+</body>
+</html>
+"""
+)
+
+
+_LIMITE_ENTRADAS_EM_MEMORIA = 1000
+
+
+def _inserir_ordenado(destino: List[str], nomes: Iterable[str]) -> None:
+    # Mantém a lista ordenada e sem repetições já na inserção.
+    for nome in nomes:
+        posicao = bisect.bisect_left(destino, nome)
+        if posicao == len(destino) or destino[posicao] != nome:
+            destino.insert(posicao, nome)
 
 
 class HtmlLogWriter:
@@ -137,11 +261,21 @@ class HtmlLogWriter:
         )
 
         self._lock = threading.Lock()
-        self._entries: List[_LogEntry] = []
+        # As entradas já renderizadas vão para um arquivo de fragmento em disco;
+        # em memória fica só uma fila curta. deque.append é atômico, então o
+        # registro não disputa lock: apenas quem descarrega a fila o segura.
+        self._pendentes: Deque[str] = deque()
+        self._lock_fragmento = threading.Lock()
+        self._fragmento = self._arquivo.with_suffix(".frag")
+        self._arquivo_fragmento = self._fragmento.open(
+            "w", encoding="utf-8", buffering=1 << 20
+        )
+        self._origem_relogio = self._generated_at.timestamp() - time.monotonic()
+        self._horario_cache: Tuple[int, str] = (-1, "")
         self._source_size: Optional[int] = None
         self._destination_size: Optional[int] = None
         self._total_migration_seconds: Optional[float] = None
-        self._comparison: Dict[str, Dict[str, Set[str]]] = {}
+        self._comparison: Dict[str, Dict[str, List[str]]] = {}
 
     @classmethod
     def from_config(cls, config: Dict[str, object]) -> "HtmlLogWriter":
@@ -164,11 +298,36 @@ class HtmlLogWriter:
         return wrapper
 
     def log_message(self, mensagem: str, nivel: Optional[str] = None) -> None:
-        nivel_real = nivel or _inferir_nivel(mensagem)
-        with self._lock:
-            self._entries.append(
-                _LogEntry(instante=datetime.now(), nivel=nivel_real, mensagem=mensagem)
-            )
+        if not nivel:
+            nivel = _inferir_nivel(mensagem)
+        self._pendentes.append(
+            f"{_abrir_entrada(nivel)}{self._formatar_horario()}</span>"
+            f'<span class="message">{_escape_message(mensagem)}</span>'
+            "</li>\n"
+        )
+        if len(self._pendentes) < _LIMITE_ENTRADAS_EM_MEMORIA:
+            return
+        if self._lock_fragmento.acquire(blocking=False):
+            try:
+                self._descarregar_pendentes()
+            finally:
+                self._lock_fragmento.release()
+
+    def _formatar_horario(self) -> str:
+        # Relógio monotônico + deslocamento fixo: nenhum datetime por entrada.
+        # Rajadas de log caem no mesmo segundo; formata o horário uma vez só.
+        segundo = int(self._origem_relogio + time.monotonic())
+        segundo_anterior, horario = self._horario_cache
+        if segundo != segundo_anterior:
+            horario = time.strftime("%H:%M:%S", time.localtime(segundo))
+            self._horario_cache = (segundo, horario)
+        return horario
+
+    def _descarregar_pendentes(self) -> None:
+        pendentes = self._pendentes
+        escrever = self._arquivo_fragmento.write
+        while pendentes:
+            escrever(pendentes.popleft())
 
     def set_source_size(self, tamanho_bytes: Optional[int]) -> None:
         self._source_size = tamanho_bytes
@@ -188,34 +347,21 @@ class HtmlLogWriter:
             for categoria, dados in comparacao.items():
                 destino = self._comparison.setdefault(
                     categoria,
-                    {"faltantes": set(), "excedentes": set()},
+                    {"faltantes": [], "excedentes": []},
                 )
                 faltantes = dados.get("faltantes_no_destino", [])
                 excedentes = dados.get("excedentes_no_destino", [])
-                destino["faltantes"].update(faltantes)
-                destino["excedentes"].update(excedentes)
-
-    def _render_entries(self) -> str:
-        itens: List[str] = []
-        for entry in self._entries:
-            mensagem_html = _escape_message(entry.mensagem)
-            linha = (
-                f'<li class="log-entry {entry.nivel}">'  # noqa: E501
-                f'<span class="timestamp">{entry.instante.strftime("%H:%M:%S")}</span>'
-                f'<span class="message">{mensagem_html}</span>'
-                "</li>"
-            )
-            itens.append(linha)
-        return "\n".join(itens)
+                _inserir_ordenado(destino["faltantes"], faltantes)
+                _inserir_ordenado(destino["excedentes"], excedentes)
 
     def _render_comparison(self) -> str:
         if not self._comparison:
             return '<p class="empty">Nenhuma diferença encontrada entre o destino e o modelo.</p>'
         linhas: List[str] = []
-        for categoria in sorted(self._comparison.keys()):
+        for categoria in sorted(self._comparison):
             dados = self._comparison[categoria]
-            faltantes = ", ".join(sorted(dados["faltantes"])) or "Nenhum"
-            excedentes = ", ".join(sorted(dados["excedentes"])) or "Nenhum"
+            faltantes = ", ".join(dados["faltantes"]) or "Nenhum"
+            excedentes = ", ".join(dados["excedentes"]) or "Nenhum"
             linhas.append(
                 "<tr>"
                 f"<td>{html.escape(categoria.title())}</td>"
@@ -231,67 +377,23 @@ class HtmlLogWriter:
         )
 
     def finalize(self) -> Path:
-        conteudo = f"""<!DOCTYPE html>
-<html lang=\"pt-BR\">
-<head>
-<meta charset=\"utf-8\"/>
-<title>Relatório de Migração - {html.escape(self._nome_banco)}</title>
-<style>
-body {{ font-family: Arial, sans-serif; background: #f7f9fc; color: #263238; margin: 0; padding: 20px; }}
-header {{ background: #1E88E5; color: white; padding: 20px; border-radius: 8px; }}
-.summary {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(220px, 1fr)); gap: 16px; margin: 20px 0; }}
-.card {{ background: white; border-radius: 8px; padding: 16px; box-shadow: 0 2px 6px rgba(0,0,0,0.08); }}
-.card h3 {{ margin-top: 0; font-size: 1.05rem; color: #546E7A; }}
-.card p {{ margin: 0; font-size: 1.2rem; font-weight: bold; }}
-section {{ margin-bottom: 32px; }}
-section h2 {{ color: #1E88E5; }}
-.log-entries {{ list-style: none; padding: 0; margin: 0; background: white; border-radius: 8px; box-shadow: 0 2px 6px rgba(0,0,0,0.08); }}
-.log-entry {{ display: flex; gap: 16px; padding: 12px 16px; border-bottom: 1px solid #ECEFF1; align-items: baseline; }}
-.log-entry:last-child {{ border-bottom: none; }}
-.log-entry.error {{ color: #C62828; font-weight: bold; }}
-.log-entry.warning {{ color: #EF6C00; }}
-.timestamp {{ min-width: 80px; font-weight: bold; color: #455A64; }}
-.comparison {{ width: 100%; border-collapse: collapse; background: white; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 6px rgba(0,0,0,0.08); }}
-.comparison th, .comparison td {{ padding: 12px 16px; border-bottom: 1px solid #ECEFF1; text-align: left; }}
-.comparison th {{ background: #E3F2FD; color: #1E88E5; font-size: 0.95rem; text-transform: uppercase; }}
-.comparison tr:last-child td {{ border-bottom: none; }}
-.empty {{ font-style: italic; color: #78909C; }}
-</style>
-</head>
-<body>
-<header>
-  <h1>Relatório de Migração - {html.escape(self._nome_banco)}</h1>
-  <p>Gerado em {self._generated_at.strftime('%d/%m/%Y %H:%M')}</p>
-</header>
-<section>
-  <h2>Resumo</h2>
-    <div class=\"summary\">
-      <div class=\"card\">
-        <h3>Tamanho do banco FDB original</h3>
-        <p>{_formatar_tamanho(self._source_size)}</p>
-      </div>
-      <div class=\"card\">
-        <h3>Tamanho do banco SQL final</h3>
-        <p>{_formatar_tamanho(self._destination_size)}</p>
-      </div>
-      <div class=\"card\">
-        <h3>Tempo total da migração</h3>
-        <p>{_formatar_duracao(self._total_migration_seconds)}</p>
-      </div>
-    </div>
-</section>
-<section>
-  <h2>Logs da Migração</h2>
-  <ul class=\"log-entries\">
-    {self._render_entries()}
-  </ul>
-</section>
-<section>
-  <h2>Relatório comparativo pós-migração</h2>
-  {self._render_comparison()}
-</section>
-</body>
-</html>
-"""
-        self._arquivo.write_text(conteudo, encoding="utf-8")
+        campos = {
+            "nome": html.escape(self._nome_banco),
+            "gerado_em": self._generated_at.strftime("%d/%m/%Y %H:%M"),
+            "tamanho_origem": _formatar_tamanho(self._source_size),
+            "tamanho_destino": _formatar_tamanho(self._destination_size),
+            "duracao": _formatar_duracao(self._total_migration_seconds),
+            "comparacao": self._render_comparison(),
+        }
+        cabecalho = _CABECALHO_HTML.substitute(campos)
+        rodape = _RODAPE_HTML.substitute(campos)
+        with self._lock_fragmento:
+            self._descarregar_pendentes()
+            self._arquivo_fragmento.close()
+        with self._arquivo.open("w", encoding="utf-8", buffering=1 << 20) as arquivo:
+            arquivo.write(cabecalho)
+            with self._fragmento.open("r", encoding="utf-8") as fragmento:
+                shutil.copyfileobj(fragmento, arquivo, 1 << 20)
+            arquivo.write(rodape)
+        self._fragmento.unlink(missing_ok=True)
         return self._arquivo
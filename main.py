@@ -1,7 +1,10 @@
+import functools
+import queue
 import threading
 import tkinter as tk
+from collections import deque
 from tkinter import messagebox, ttk
-from typing import Dict, List, Optional, Sequence
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
 
 from controller import ApplicationController
 
@@ -44,38 +47,200 @@ BUTTON_COLORS = {
     },
 }
 
+_BUTTON_KW = {
+    estilo: {
+        "bg": cores["background"],
+        "fg": cores["foreground"],
+        "activebackground": cores["activebackground"],
+        "activeforeground": cores["activeforeground"],
+        "relief": tk.RAISED,
+        "bd": 1,
+        "cursor": "hand2",
+        "padx": 10,
+        "pady": 5,
+        "disabledforeground": "#CFD8DC",
+        "highlightthickness": 0,
+    }
+    for estilo, cores in BUTTON_COLORS.items()
+}
+_BUTTON_KW_PADRAO = _BUTTON_KW["primary"]
+
 
 def criar_botao_colorido(
     parent, texto, comando, *, estilo="primary", fonte=("Arial", 10)
 ):
-    cores = BUTTON_COLORS.get(estilo, BUTTON_COLORS["primary"])
-    return tk.Button(
-        parent,
-        text=texto,
-        font=fonte,
-        command=comando,
-        bg=cores["background"],
-        fg=cores["foreground"],
-        activebackground=cores["activebackground"],
-        activeforeground=cores["activeforeground"],
-        relief=tk.RAISED,
-        bd=1,
-        cursor="hand2",
-        padx=10,
-        pady=5,
-        disabledforeground="#CFD8DC",
-        highlightthickness=0,
-    )
+    opcoes = _BUTTON_KW.get(estilo, _BUTTON_KW_PADRAO)
+    return tk.Button(parent, text=texto, font=fonte, command=comando, **opcoes)
+
+
+class BufferedTextOutput:
+    """Accumulates lines from any thread and writes them to a Text in batches."""
+
+    MARGEM_CORTE = 1000
+
+    def __init__(
+        self, widget: tk.Text, intervalo_ms: int = 50, limite_linhas: int = 5000
+    ):
+        self.widget = widget
+        self.intervalo_ms = intervalo_ms
+        self.limite_linhas = limite_linhas
+        # deque.append/popleft são atômicos: as threads de trabalho nunca
+        # esperam pelo Tk nem disputam lock para registrar uma linha.
+        self._pendentes: Deque[str] = deque()
+        # Registra o callback uma vez; widget.after criaria um comando Tcl novo
+        # a cada volta do ciclo.
+        self._comando_flush = widget.register(self._flush)
+        self._agendar()
+
+    def _agendar(self) -> None:
+        self.widget.tk.call("after", self.intervalo_ms, self._comando_flush)
+
+    def write(self, texto: str) -> None:
+        self._pendentes.append(texto)
+
+    def clear(self) -> None:
+        self.widget.config(state=tk.NORMAL)
+        self.widget.delete("1.0", tk.END)
+        self.widget.config(state=tk.DISABLED)
+
+    def _flush(self) -> None:
+        pendentes = self._pendentes
+        linhas = [pendentes.popleft() for _ in range(len(pendentes))]
+        if linhas:
+            linhas.append("")
+            bloco = "\n".join(linhas)
+            self.widget.config(state=tk.NORMAL)
+            self.widget.insert(tk.END, bloco)
+            # Mantém só as últimas linhas; o histórico completo fica no log. O
+            # corte espera juntar uma margem para não apagar poucas linhas a
+            # cada lote.
+            linhas_total = int(self.widget.index("end-1c").split(".")[0])
+            excedente = linhas_total - self.limite_linhas
+            if excedente >= self.MARGEM_CORTE:
+                self.widget.delete("1.0", f"{excedente + 1}.0")
+            self.widget.see(tk.END)
+            self.widget.config(state=tk.DISABLED)
+            # Redesenha o lote já, sem processar eventos do usuário (como update()).
+            self.widget.update_idletasks()
+        self._agendar()
+
+
+class UiDispatcher:
+    """Runs callables posted from worker threads on the Tk thread."""
+
+    def __init__(self, widget: tk.Misc, intervalo_ms: int = 50):
+        self.widget = widget
+        self.intervalo_ms = intervalo_ms
+        self._tarefas: Deque[Callable[[], None]] = deque()
+        self._comando = widget.register(self._processar)
+        self._agendar()
+
+    def post(self, tarefa: Callable[[], None]) -> None:
+        self._tarefas.append(tarefa)
+
+    def _agendar(self) -> None:
+        self.widget.tk.call("after", self.intervalo_ms, self._comando)
+
+    def _processar(self) -> None:
+        # Reagenda antes: uma tarefa pode abrir um diálogo modal e demorar.
+        self._agendar()
+        # Um diálogo modal reentra aqui pelo wait_window e consome a mesma fila.
+        tarefas = self._tarefas
+        while tarefas:
+            tarefas.popleft()()
+
+
+def _criar_imagem_caixa(master, marcada: bool) -> tk.PhotoImage:
+    tamanho = 13
+    imagem = tk.PhotoImage(master=master, width=tamanho, height=tamanho)
+    imagem.put("#607D8B", to=(0, 0, tamanho, tamanho))
+    imagem.put("#FFFFFF", to=(1, 1, tamanho - 1, tamanho - 1))
+    if marcada:
+        imagem.put("#1E88E5", to=(3, 3, tamanho - 3, tamanho - 3))
+    return imagem
+
+
+class ScrollableFrame(tk.Frame):
+    """Frame with a vertical scrollbar; child widgets go in ``conteudo``."""
+
+    def __init__(self, master):
+        super().__init__(master)
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.canvas.pack(side=tk.LEFT, fill="both", expand=True)
+
+        self.scrollbar = tk.Scrollbar(
+            self, orient=tk.VERTICAL, command=self.canvas.yview
+        )
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+
+        self.conteudo = tk.Frame(self.canvas)
+        self._janela_conteudo = self.canvas.create_window(
+            (0, 0), window=self.conteudo, anchor="nw"
+        )
+        self._largura = 0
+        self._scroll_pendente = False
+
+        self.conteudo.bind("<Configure>", self._atualizar_scroll)
+        self.canvas.bind("<Configure>", self._ajustar_largura)
+
+        # A janela recebe a roda do mouse de qualquer widget filho; só rola
+        # quando o ponteiro está sobre esta área.
+        janela = self.winfo_toplevel()
+        for evento in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            janela.bind(evento, self._rolar, add="+")
+
+    def _rolar(self, event):
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        caminho = str(self)
+        if widget is None or not (
+            str(widget) == caminho or str(widget).startswith(caminho + ".")
+        ):
+            return
+        if event.num == 4:
+            passo = -1
+        elif event.num == 5:
+            passo = 1
+        else:
+            passo = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+        self.canvas.yview_scroll(passo, "units")
+
+    def _atualizar_scroll(self, _event=None):
+        # Cada filho criado dispara <Configure>; recalcula a área uma vez só,
+        # quando o Tk ficar ocioso.
+        if self._scroll_pendente:
+            return
+        self._scroll_pendente = True
+        self.after_idle(self._aplicar_scroll)
+
+    def _aplicar_scroll(self):
+        self._scroll_pendente = False
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
+    def _ajustar_largura(self, event):
+        # <Configure> também dispara quando só a altura muda.
+        if event.width == self._largura:
+            return
+        self._largura = event.width
+        self.canvas.itemconfigure(self._janela_conteudo, width=event.width)
 
 
 class TableSelector(tk.Frame):
-    def __init__(self, master, min_column_width: int = 200):
+    # O estado de cada tabela é uma tag com imagem de caixa de seleção, o que
+    # permite marcar muitas tabelas com um único comando Tcl.
+    MARCADA = "marcada"
+    DESMARCADA = "desmarcada"
+    ATRASO_PESQUISA_MS = 150
+
+    def __init__(self, master, altura: int = 12):
         super().__init__(master)
-        self.min_column_width = min_column_width
-        self.columns = 1
         self.all_tables: List[str] = []
+        self._lower_tables: List[Tuple[str, str]] = []
+        self._ultima_busca: Tuple[str, List[Tuple[str, str]]] = ("", [])
         self.selected_tables = set()
-        self.checkbutton_variables: Dict[str, tk.BooleanVar] = {}
+        self._filter_job: Optional[str] = None
+        self._visiveis: Optional[List[str]] = None
+        self._aviso_vazio_visivel = False
 
         self.search_value = tk.StringVar()
         self.search_value.trace_add("write", self._on_search_change)
@@ -111,136 +276,177 @@ class TableSelector(tk.Frame):
         list_container = tk.Frame(self)
         list_container.pack(fill="both", expand=True)
 
-        self.canvas = tk.Canvas(list_container, borderwidth=0)
-        self.canvas.pack(side=tk.LEFT, fill="both", expand=True)
+        # Um único Treeview desenha só as linhas visíveis, em vez de um
+        # Checkbutton por tabela.
+        self.tree = ttk.Treeview(
+            list_container, show="tree", selectmode="none", height=altura
+        )
+        self.tree.pack(side=tk.LEFT, fill="both", expand=True)
 
         self.scrollbar_vertical = tk.Scrollbar(
-            list_container, orient=tk.VERTICAL, command=self.canvas.yview
+            list_container, orient=tk.VERTICAL, command=self.tree.yview
         )
         self.scrollbar_vertical.pack(side=tk.RIGHT, fill=tk.Y)
 
-        self.canvas.configure(yscrollcommand=self.scrollbar_vertical.set)
-
-        self.inner_frame = tk.Frame(self.canvas)
-        self.canvas_window = self.canvas.create_window(
-            (0, 0), window=self.inner_frame, anchor="nw"
+        self.tree.configure(yscrollcommand=self.scrollbar_vertical.set)
+        self._imagens = {
+            self.MARCADA: _criar_imagem_caixa(self, True),
+            self.DESMARCADA: _criar_imagem_caixa(self, False),
+        }
+        for tag, imagem in self._imagens.items():
+            self.tree.tag_configure(tag, image=imagem)
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<space>", self._on_space)
+
+        self.empty_label = tk.Label(
+            self.tree, text="Nenhuma tabela encontrada.", font=("Arial", 11)
         )
 
-        self.inner_frame.bind("<Configure>", self._update_scroll_region)
-        self.bind("<Configure>", self._on_resize)
-
-        self.scrollbar_horizontal = tk.Scrollbar(
-            list_container, orient=tk.HORIZONTAL, command=self.canvas.xview
-        )
-        self.scrollbar_horizontal.pack(fill=tk.X, side=tk.BOTTOM)
-
-        self.canvas.configure(xscrollcommand=self.scrollbar_horizontal.set)
-
     def focus_search(self):
         self.search_entry.focus_set()
 
     def set_tables(self, tables: Sequence[str]):
-        self.all_tables = sorted(tables)
-        self.selected_tables.intersection_update(self.all_tables)
-        self._rebuild_checkbuttons()
+        # Só remove/insere o que mudou; itens que continuam são reaproveitados.
+        # Ordena a sequência recebida, não o conjunto: a origem costuma vir com
+        # ORDER BY, e o Timsort reconhece a lista já ordenada em uma passada.
+        ordenadas = sorted(tables)
+        novas = set(ordenadas)
+        if len(novas) != len(ordenadas):
+            # Nomes repetidos (mesma tabela em schemas diferentes) viram um item.
+            ordenadas = sorted(novas)
+        removidas = [tabela for tabela in self.all_tables if tabela not in novas]
+        if removidas:
+            self.tree.delete(*removidas)
+        existentes = set(self.all_tables)
+        self.all_tables = ordenadas
+        self._lower_tables = [(tabela, tabela.lower()) for tabela in self.all_tables]
+        self._ultima_busca = ("", self._lower_tables)
+        self.selected_tables.intersection_update(novas)
+        inserir = self.tree.insert
+        tag_item = self._tag_item
+        for tabela in self.all_tables:
+            if tabela not in existentes:
+                inserir("", "end", iid=tabela, text=tabela, tags=(tag_item(tabela),))
+        self._visiveis = None
+        self._apply_filter()
 
     def get_selected_tables(self) -> List[str]:
-        return [t for t in self.all_tables if t in self.selected_tables]
+        # all_tables já é ordenada e contém todas as selecionadas: ordenar só as
+        # selecionadas dá a mesma ordem sem percorrer a lista inteira.
+        return sorted(self.selected_tables)
 
     def select_all_tables(self):
-        self.selected_tables = set(self.all_tables)
-        for tabela, variavel in self.checkbutton_variables.items():
-            variavel.set(True)
+        marcar = [t for t in self.all_tables if t not in self.selected_tables]
+        if not marcar:
+            return
+        self.selected_tables.update(marcar)
+        # "tag remove" sem itens vale para a árvore toda; "tag add" recebe a
+        # lista inteira. São dois comandos Tcl, seja qual for o número de tabelas.
+        arvore = str(self.tree)
+        self.tree.tk.call(arvore, "tag", "remove", self.DESMARCADA)
+        self.tree.tk.call(arvore, "tag", "add", self.MARCADA, marcar)
+
+    def _tag_item(self, tabela: str) -> str:
+        return self.MARCADA if tabela in self.selected_tables else self.DESMARCADA
 
     def _filtered_tables(self) -> List[str]:
         termo = self.search_value.get().strip().lower()
         if not termo:
+            self._ultima_busca = ("", self._lower_tables)
             return list(self.all_tables)
-        return [tabela for tabela in self.all_tables if termo in tabela.lower()]
-
-    def _rebuild_checkbuttons(self):
-        for widget in self.inner_frame.winfo_children():
-            widget.destroy()
-        self.checkbutton_variables.clear()
-
+        # Quem contém o termo novo contém o anterior: ao continuar digitando,
+        # basta filtrar o resultado da busca passada.
+        termo_anterior, candidatas = self._ultima_busca
+        if termo_anterior not in termo:
+            candidatas = self._lower_tables
+        encontradas = [par for par in candidatas if termo in par[1]]
+        self._ultima_busca = (termo, encontradas)
+        return [tabela for tabela, _minusculo in encontradas]
+
+    def _apply_filter(self):
+        self._filter_job = None
         tabelas_filtradas = self._filtered_tables()
-
-        if not tabelas_filtradas:
-            tk.Label(
-                self.inner_frame, text="Nenhuma tabela encontrada.", font=("Arial", 11)
-            ).grid(row=0, column=0, padx=10, pady=10, sticky="w")
-            self._update_scroll_region()
+        if tabelas_filtradas == self._visiveis:
             return
+        self._visiveis = tabelas_filtradas
 
-        for column in range(self.columns):
-            self.inner_frame.grid_columnconfigure(column, weight=1, pad=5)
-
-        for indice, tabela in enumerate(tabelas_filtradas):
-            variavel = tk.BooleanVar(value=tabela in self.selected_tables)
-            self.checkbutton_variables[tabela] = variavel
-            caixa_selecao = tk.Checkbutton(
-                self.inner_frame,
-                text=tabela,
-                variable=variavel,
-                onvalue=True,
-                offvalue=False,
-                anchor="w",
-                padx=10,
-                pady=2,
-                command=lambda nome=tabela, var=variavel: self._toggle_selection(
-                    nome, var.get()
-                ),
-            )
-            linha = indice // self.columns
-            coluna = indice % self.columns
-            caixa_selecao.grid(row=linha, column=coluna, sticky="w")
-
-        self._update_scroll_region()
+        # set_children reordena os visíveis e desanexa o restante numa só chamada.
+        self.tree.set_children("", *tabelas_filtradas)
+        self.tree.yview_moveto(0)
 
-    def _toggle_selection(self, tabela, selecionada):
-        if selecionada:
-            self.selected_tables.add(tabela)
+        # Só fala com o Tk quando o aviso de lista vazia muda de estado.
+        vazio = not tabelas_filtradas
+        if vazio == self._aviso_vazio_visivel:
+            return
+        self._aviso_vazio_visivel = vazio
+        if vazio:
+            self.empty_label.place(x=10, y=10)
         else:
+            self.empty_label.place_forget()
+
+    def _toggle_selection(self, tabela):
+        if tabela in self.selected_tables:
             self.selected_tables.discard(tabela)
+        else:
+            self.selected_tables.add(tabela)
+        self.tree.item(tabela, tags=(self._tag_item(tabela),))
+
+    def _on_click(self, event):
+        tabela = self.tree.identify_row(event.y)
+        if tabela:
+            self.tree.focus(tabela)
+            self._toggle_selection(tabela)
+
+    def _on_space(self, _event):
+        tabela = self.tree.focus()
+        if tabela:
+            self._toggle_selection(tabela)
 
     def _clear_search(self):
         self.search_value.set("")
 
     def _on_search_change(self, *_):
-        self._rebuild_checkbuttons()
-
-    def _on_resize(self, event):
-        largura = max(1, event.width)
-        novas_colunas = max(1, largura // self.min_column_width)
-        if novas_colunas != self.columns:
-            self.columns = novas_colunas
-            self._rebuild_checkbuttons()
-
-    def _update_scroll_region(self, _event=None):
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+            self._filter_job = None
+        # Digitar e apagar o mesmo caractere não agenda um novo filtro.
+        if self.search_value.get().strip().lower() == self._ultima_busca[0]:
+            return
+        self._filter_job = self.after(self.ATRASO_PESQUISA_MS, self._apply_filter)
 
 
 class ConstraintDialog(tk.Toplevel):
-    def __init__(self, master, tabela: str, constraint: str):
+    def __init__(self, master, pendencias: Sequence[Tuple[str, str]]):
         super().__init__(master)
-        self.title("Ajustar Constraint")
-        self.resizable(False, False)
+        self.title("Ajustar Constraints")
+        self.geometry("560x480")
         self.transient(master)
         self.grab_set()
 
         mensagem = (
-            f"A constraint '{constraint}' na tabela '{tabela}' não pôde ser reativada.\n"
-            "Informe um comando SQL para ajustar os dados ou clique em Ignorar."
+            f"{len(pendencias)} constraint(s) não puderam ser reativadas.\n"
+            "Informe um comando SQL para ajustar os dados de cada uma ou deixe em "
+            "branco para ignorar."
         )
-        tk.Label(self, text=mensagem, wraplength=400, justify=tk.LEFT).pack(
+        tk.Label(self, text=mensagem, wraplength=500, justify=tk.LEFT).pack(
             padx=15, pady=(15, 10)
         )
 
-        self.texto_sql = tk.Text(self, width=60, height=6)
-        self.texto_sql.pack(padx=15, pady=(0, 10))
+        area_rolavel = ScrollableFrame(self)
+        area_rolavel.pack(fill="both", expand=True, padx=15)
+
+        self.textos_sql: Dict[Tuple[str, str], tk.Text] = {}
+        for tabela, constraint in pendencias:
+            grupo = tk.LabelFrame(
+                area_rolavel.conteudo, text=f"{tabela} — {constraint}"
+            )
+            grupo.pack(fill="x", pady=(0, 8))
+            texto_sql = tk.Text(grupo, width=60, height=3)
+            texto_sql.pack(fill="x", padx=5, pady=5)
+            self.textos_sql[(tabela, constraint)] = texto_sql
 
         botoes = tk.Frame(self)
-        botoes.pack(pady=(0, 15))
+        botoes.pack(pady=15)
 
         criar_botao_colorido(
             botoes, "Executar", self._confirmar, estilo="success", fonte=("Arial", 10)
@@ -249,20 +455,31 @@ class ConstraintDialog(tk.Toplevel):
             botoes, "Ignorar", self._cancelar, estilo="secondary", fonte=("Arial", 10)
         ).pack(side=tk.LEFT, padx=5)
 
-        self.resultado: Optional[str] = None
-        self.texto_sql.focus_set()
+        self.resultado: Dict[Tuple[str, str], str] = {}
+        if self.textos_sql:
+            next(iter(self.textos_sql.values())).focus_set()
         self.protocol("WM_DELETE_WINDOW", self._cancelar)
 
     def _confirmar(self):
-        comando = self.texto_sql.get("1.0", tk.END).strip()
-        self.resultado = comando if comando else None
+        for chave, texto_sql in self.textos_sql.items():
+            comando = texto_sql.get("1.0", tk.END).strip()
+            if comando:
+                self.resultado[chave] = comando
         self.destroy()
 
     def _cancelar(self):
-        self.resultado = None
+        self.resultado = {}
         self.destroy()
 
 
+# (chave em "settings", rótulo, largura da entrada, valor padrão, conversor)
+CAMPOS_SETTINGS = (
+    ("chunk_size", "Chunk Size", 10, 5000, int),
+    ("worker_count", "Trabalhadores paralelos", 10, 1, int),
+    ("log_path", "Caminho do Log", 40, "logs/dump.log", str),
+)
+
+
 class ConnectionEditor(tk.LabelFrame):
     FIREBIRD_FIELDS = (
         ("database", "Caminho do Banco"),
@@ -321,12 +538,13 @@ class ConnectionEditor(tk.LabelFrame):
         frame = tk.Frame(container)
         self.frames[tipo] = frame
         self.entries[tipo] = {}
-        for chave, rotulo in campos:
-            linha = tk.Frame(frame)
-            linha.pack(fill="x", pady=2)
-            tk.Label(linha, text=f"{rotulo}:").pack(side=tk.LEFT)
-            entrada = tk.Entry(linha, width=40)
-            entrada.pack(side=tk.LEFT, padx=(5, 0), fill="x", expand=True)
+        frame.columnconfigure(1, weight=1)
+        for linha, (chave, rotulo) in enumerate(campos):
+            tk.Label(frame, text=f"{rotulo}:").grid(
+                row=linha, column=0, sticky="w", pady=2
+            )
+            entrada = tk.Entry(frame, width=40)
+            entrada.grid(row=linha, column=1, sticky="ew", padx=(5, 0), pady=2)
             valor = valores_iniciais.get(chave)
             if valor is not None:
                 entrada.insert(0, str(valor))
@@ -372,17 +590,11 @@ def criar_interface():
         for botao in botoes_operacoes:
             botao.config(state=tk.NORMAL if habilitado else tk.DISABLED)
 
-    def escrever_saida(widget: tk.Text, texto: str):
-        widget.config(state=tk.NORMAL)
-        widget.insert(tk.END, texto + "\n")
-        widget.see(tk.END)
-        widget.config(state=tk.DISABLED)
-
     def log_message(mensagem: str):
-        root.after(0, lambda: escrever_saida(log_texto, mensagem))
+        saida_log.write(mensagem)
 
     def registrar_sql(comando: str):
-        root.after(0, lambda: escrever_saida(caixa_sql, comando))
+        saida_sql.write(comando)
 
     controller.register_sql_listener(registrar_sql)
 
@@ -394,6 +606,17 @@ def criar_interface():
         estado_operacao["em_andamento"] = False
         definir_botoes_habilitados(True)
 
+    # Um único worker reaproveitado: as operações da interface já são exclusivas.
+    # A thread é daemon, assim como as que o controller usa para as tabelas e
+    # contagens: fechar a janela não espera uma chamada ao banco em andamento.
+    fila_operacoes: "queue.Queue[Callable[[], None]]" = queue.Queue()
+
+    def processar_operacoes():
+        while True:
+            fila_operacoes.get()()
+
+    threading.Thread(target=processar_operacoes, name="operacao", daemon=True).start()
+
     def executar_em_thread(acao):
         if estado_operacao["em_andamento"]:
             return
@@ -406,14 +629,16 @@ def criar_interface():
             except Exception as erro:
                 log_message(f"[ERRO] {erro}")
             finally:
-                root.after(0, finalizar_operacao)
+                despachante.post(finalizar_operacao)
 
-        threading.Thread(target=wrapper, daemon=True).start()
+        fila_operacoes.put(wrapper)
 
     def limpar_sql_ui():
-        caixa_sql.config(state=tk.NORMAL)
-        caixa_sql.delete("1.0", tk.END)
-        caixa_sql.config(state=tk.DISABLED)
+        saida_sql.clear()
+
+    def limpar_sql():
+        controller.clear_sql_history()
+        limpar_sql_ui()
 
     def atualizar_tabelas_ui(tabelas: Sequence[str]):
         table_selector.set_tables(tabelas)
@@ -421,16 +646,16 @@ def criar_interface():
     def conectar():
         def acao():
             controller.clear_sql_history()
-            root.after(0, limpar_sql_ui)
+            despachante.post(limpar_sql_ui)
             tabelas = controller.connect(log_message)
-            root.after(0, lambda: atualizar_tabelas_ui(tabelas))
+            despachante.post(functools.partial(atualizar_tabelas_ui, tabelas))
 
         executar_em_thread(acao)
 
     def atualizar_tabelas():
         def acao():
             tabelas = controller.refresh_tables()
-            root.after(0, lambda: atualizar_tabelas_ui(tabelas))
+            despachante.post(functools.partial(atualizar_tabelas_ui, tabelas))
             log_message(f"📋 {len(tabelas)} tabelas atualizadas da origem.")
 
         executar_em_thread(acao)
@@ -438,19 +663,21 @@ def criar_interface():
     def obter_tabelas_selecionadas() -> List[str]:
         return table_selector.get_selected_tables()
 
-    def solicitar_ajuste_constraint(tabela: str, constraint: str) -> Optional[str]:
+    def solicitar_ajuste_constraints(
+        pendencias: Sequence[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], str]:
         evento = threading.Event()
-        resposta: Dict[str, Optional[str]] = {"sql": None}
+        resposta: Dict[str, Dict[Tuple[str, str], str]] = {"comandos": {}}
 
         def abrir_dialogo():
-            dialogo = ConstraintDialog(root, tabela, constraint)
+            dialogo = ConstraintDialog(root, pendencias)
             root.wait_window(dialogo)
-            resposta["sql"] = dialogo.resultado
+            resposta["comandos"] = dialogo.resultado
             evento.set()
 
-        root.after(0, abrir_dialogo)
+        despachante.post(abrir_dialogo)
         evento.wait()
-        return resposta["sql"]
+        return resposta["comandos"]
 
     def iniciar_migracao():
         tabelas = obter_tabelas_selecionadas()
@@ -461,7 +688,7 @@ def criar_interface():
             return
 
         def acao():
-            controller.run_migration(tabelas, log_message, solicitar_ajuste_constraint)
+            controller.run_migration(tabelas, log_message, solicitar_ajuste_constraints)
 
         executar_em_thread(acao)
 
@@ -471,7 +698,7 @@ def criar_interface():
 
         executar_em_thread(acao)
 
-    def contar_registros():
+    def contar_registros(aproximado: bool = False):
         tabelas = obter_tabelas_selecionadas()
         if not tabelas:
             messagebox.showwarning(
@@ -481,7 +708,7 @@ def criar_interface():
             return
 
         def acao():
-            controller.count_records(tabelas, log_message)
+            controller.count_records(tabelas, log_message, aproximado)
 
         executar_em_thread(acao)
 
@@ -506,38 +733,28 @@ def criar_interface():
         controller.cancel_current_operation()
         log_message("⏹️ Cancelamento solicitado. Aguardando finalização segura...")
 
+    dialogo_config: Dict[str, Optional[tk.Toplevel]] = {"janela": None}
+
     def abrir_configuracoes():
+        # Fechar sem salvar só esconde a janela; ela volta como estava.
+        if dialogo_config["janela"] is not None:
+            janela = dialogo_config["janela"]
+            janela.deiconify()
+            janela.lift()
+            return
+
         config_atual = controller.get_config()
 
         janela = tk.Toplevel(root)
         janela.title("Editar Configuração")
         janela.geometry("680x700")
         janela.transient(root)
+        janela.protocol("WM_DELETE_WINDOW", janela.withdraw)
+        dialogo_config["janela"] = janela
 
-        scroll_container = tk.Frame(janela)
-        scroll_container.pack(fill="both", expand=True)
-
-        canvas = tk.Canvas(scroll_container, highlightthickness=0)
-        canvas.pack(side=tk.LEFT, fill="both", expand=True)
-
-        scrollbar = tk.Scrollbar(
-            scroll_container, orient=tk.VERTICAL, command=canvas.yview
-        )
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        conteudo = tk.Frame(canvas)
-        canvas_window = canvas.create_window((0, 0), window=conteudo, anchor="nw")
-
-        def _atualizar_scroll(_event=None):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-
-        def _ajustar_largura(event):
-            canvas.itemconfigure(canvas_window, width=event.width)
-
-        conteudo.bind("<Configure>", _atualizar_scroll)
-        canvas.bind("<Configure>", _ajustar_largura)
+        area_rolavel = ScrollableFrame(janela)
+        area_rolavel.pack(fill="both", expand=True)
+        conteudo = area_rolavel.conteudo
 
         editores = {}
         for chave, titulo in (
@@ -549,55 +766,92 @@ def criar_interface():
             editor.pack(fill="x", padx=10, pady=10)
             editores[chave] = editor
 
+        settings_atual = config_atual.get("settings", {})
         settings_frame = tk.LabelFrame(conteudo, text="Configurações Gerais")
         settings_frame.pack(fill="x", padx=10, pady=10)
 
-        linha_chunk = tk.Frame(settings_frame)
-        linha_chunk.pack(fill="x", pady=5)
-        tk.Label(linha_chunk, text="Chunk Size:").pack(side=tk.LEFT)
-        chunk_entry = tk.Entry(linha_chunk, width=10)
-        chunk_entry.pack(side=tk.LEFT, padx=(5, 0))
-        chunk_entry.insert(0, str(config_atual["settings"].get("chunk_size", 5000)))
-
-        linha_workers = tk.Frame(settings_frame)
-        linha_workers.pack(fill="x", pady=5)
-        tk.Label(linha_workers, text="Trabalhadores paralelos:").pack(side=tk.LEFT)
-        workers_entry = tk.Entry(linha_workers, width=10)
-        workers_entry.pack(side=tk.LEFT, padx=(5, 0))
-        workers_entry.insert(0, str(config_atual["settings"].get("worker_count", 1)))
-
-        linha_log = tk.Frame(settings_frame)
-        linha_log.pack(fill="x", pady=5)
-        tk.Label(linha_log, text="Caminho do Log:").pack(side=tk.LEFT)
-        log_entry = tk.Entry(linha_log, width=40)
-        log_entry.pack(side=tk.LEFT, padx=(5, 0), fill="x", expand=True)
-        log_entry.insert(
-            0, str(config_atual["settings"].get("log_path", "logs/dump.log"))
-        )
+        settings_frame.columnconfigure(1, weight=1)
+        entradas_settings: Dict[str, tk.Entry] = {}
+        for linha, (chave, rotulo, largura, padrao, _conversor) in enumerate(
+            CAMPOS_SETTINGS
+        ):
+            tk.Label(settings_frame, text=f"{rotulo}:").grid(
+                row=linha, column=0, sticky="w", pady=5
+            )
+            entrada = tk.Entry(settings_frame, width=largura)
+            entrada.grid(
+                row=linha,
+                column=1,
+                sticky="ew" if largura > 10 else "w",
+                padx=(5, 0),
+                pady=5,
+            )
+            entrada.insert(0, str(settings_atual.get(chave, padrao)))
+            entradas_settings[chave] = entrada
 
-        tk.Label(settings_frame, text="Consulta de Informações:").pack()
+        tk.Label(settings_frame, text="Consulta de Informações:").grid(
+            row=len(CAMPOS_SETTINGS), column=0, columnspan=2
+        )
         info_text = tk.Text(settings_frame, width=60, height=4)
-        info_text.pack(fill="x", pady=(0, 5))
+        info_text.grid(
+            row=len(CAMPOS_SETTINGS) + 1,
+            column=0,
+            columnspan=2,
+            sticky="ew",
+            pady=(0, 5),
+        )
         info_text.insert(tk.END, controller.get_info_query())
 
         def salvar():
             try:
-                novo_config = config_atual.copy()
-                for chave, editor in editores.items():
-                    novo_config[chave] = editor.obter_dados()
-                novo_config["settings"] = {
-                    "chunk_size": int(chunk_entry.get().strip()),
-                    "worker_count": int(workers_entry.get().strip()),
-                    "log_path": log_entry.get().strip(),
+                # Mantém as opções que o formulário não edita (prefetch_batches,
+                # streaming_fetch, ...); antes elas eram descartadas ao salvar.
+                novo_settings = {
+                    **settings_atual,
+                    **{
+                        chave: conversor(entradas_settings[chave].get().strip())
+                        for chave, _rotulo, _largura, _padrao, conversor in (
+                            CAMPOS_SETTINGS
+                        )
+                    },
                     "info_query": info_text.get("1.0", tk.END).strip(),
                 }
-                controller.save_config(novo_config)
+                conexoes = {
+                    chave: editor.obter_dados() for chave, editor in editores.items()
+                }
+                novo_config = {**config_atual, **conexoes, "settings": novo_settings}
+            except Exception as erro:
+                messagebox.showerror("Erro ao salvar", str(erro))
+                return
+
+            if estado_operacao["em_andamento"]:
+                messagebox.showwarning(
+                    "Configuração",
+                    "Aguarde a operação em andamento terminar antes de salvar.",
+                )
+                return
+
+            def concluir():
                 messagebox.showinfo(
                     "Configuração", "Configuração salva com sucesso. Refaça a conexão."
                 )
+                dialogo_config["janela"] = None
                 janela.destroy()
-            except Exception as erro:
-                messagebox.showerror("Erro ao salvar", str(erro))
+
+            # Gravar o arquivo e fechar as conexões fica fora da thread do Tk.
+            def acao():
+                try:
+                    controller.save_config(novo_config)
+                except Exception as erro:
+                    despachante.post(
+                        functools.partial(
+                            messagebox.showerror, "Erro ao salvar", str(erro)
+                        )
+                    )
+                    return
+                despachante.post(concluir)
+
+            executar_em_thread(acao)
 
         botoes_inferiores = tk.Frame(janela)
         botoes_inferiores.pack(fill="x", pady=10)
@@ -624,22 +878,31 @@ def criar_interface():
     botao_contar.grid(row=0, column=2, padx=5, pady=5)
     botoes_operacoes.append(botao_contar)
 
+    botao_contar_rapido = criar_botao_colorido(
+        botoes_superiores,
+        "Contar (rápido)",
+        functools.partial(contar_registros, aproximado=True),
+        estilo="warning",
+    )
+    botao_contar_rapido.grid(row=0, column=3, padx=5, pady=5)
+    botoes_operacoes.append(botao_contar_rapido)
+
     botao_atualizar = criar_botao_colorido(
         botoes_superiores, "Atualizar Tabelas", atualizar_tabelas, estilo="info"
     )
-    botao_atualizar.grid(row=0, column=3, padx=5, pady=5)
+    botao_atualizar.grid(row=0, column=4, padx=5, pady=5)
     botoes_operacoes.append(botao_atualizar)
 
     botao_limpar = criar_botao_colorido(
         botoes_superiores, "Limpar Banco", limpar_banco_destino, estilo="warning"
     )
-    botao_limpar.grid(row=0, column=4, padx=5, pady=5)
+    botao_limpar.grid(row=0, column=5, padx=5, pady=5)
     botoes_operacoes.append(botao_limpar)
 
     botao_cancelar = criar_botao_colorido(
         botoes_superiores, "Cancelar", cancelar_operacao, estilo="danger"
     )
-    botao_cancelar.grid(row=0, column=5, padx=5, pady=5)
+    botao_cancelar.grid(row=0, column=6, padx=5, pady=5)
 
     botoes_inferiores = tk.Frame(root)
     botoes_inferiores.pack(pady=5)
@@ -647,21 +910,21 @@ def criar_interface():
     criar_botao_colorido(
         botoes_inferiores,
         "Testar Origem",
-        lambda: testar_conexao("source"),
+        functools.partial(testar_conexao, "source"),
         estilo="info",
     ).grid(row=0, column=0, padx=5, pady=5)
 
     criar_botao_colorido(
         botoes_inferiores,
         "Testar Destino",
-        lambda: testar_conexao("destination"),
+        functools.partial(testar_conexao, "destination"),
         estilo="info",
     ).grid(row=0, column=1, padx=5, pady=5)
 
     criar_botao_colorido(
         botoes_inferiores,
         "Testar Modelo",
-        lambda: testar_conexao("model"),
+        functools.partial(testar_conexao, "model"),
         estilo="info",
     ).grid(row=0, column=2, padx=5, pady=5)
 
@@ -692,6 +955,10 @@ def criar_interface():
     sql_scroll.pack(side=tk.RIGHT, fill=tk.Y)
     caixa_sql.config(yscrollcommand=sql_scroll.set, state=tk.DISABLED)
 
+    despachante = UiDispatcher(root)
+    saida_log = BufferedTextOutput(log_texto)
+    saida_sql = BufferedTextOutput(caixa_sql)
+
     barra_sql = tk.Frame(root)
     barra_sql.pack(pady=(0, 10))
 
@@ -701,15 +968,26 @@ def criar_interface():
     criar_botao_colorido(
         barra_sql,
         "Limpar SQL",
-        lambda: (controller.clear_sql_history(), limpar_sql_ui()),
+        limpar_sql,
         estilo="secondary",
         fonte=("Arial", 10),
     ).pack(side=tk.LEFT, padx=5)
 
     definir_botoes_habilitados(True)
 
+    # A última lista conhecida aparece de imediato; "Conectar" a atualiza.
+    tabelas_em_cache = controller.get_cached_tables()
+    if tabelas_em_cache:
+        atualizar_tabelas_ui(tabelas_em_cache)
+        log_message(
+            f"📋 {len(tabelas_em_cache)} tabelas carregadas do cache. "
+            "Conecte para atualizar a lista."
+        )
+
     root.mainloop()
 
+    controller.cancel_current_operation()
+
 
 if __name__ == "__main__":
     criar_interface()
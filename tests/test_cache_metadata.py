@@ -0,0 +1,39 @@
+from dump import BaseDestinationHandler, _cached
+
+
+class _CursorFalso:
+    description = None
+
+    def execute(self, comando):
+        pass
+
+
+class _ConexaoFalsa:
+    def cursor(self):
+        return _CursorFalso()
+
+    def commit(self):
+        pass
+
+
+class _HandlerContador(BaseDestinationHandler):
+    def __init__(self):
+        super().__init__(_ConexaoFalsa())
+        self.consultas = 0
+
+    @_cached
+    def list_tables(self):
+        self.consultas += 1
+        return ["CLIENTES"]
+
+
+def test_list_tables_reutiliza_resultado_ate_execucao_de_sql():
+    handler = _HandlerContador()
+
+    handler.list_tables()
+    handler.list_tables()
+    assert handler.consultas == 1
+
+    handler.execute_sql("ALTER TABLE CLIENTES ADD NOVA INT")
+    handler.list_tables()
+    assert handler.consultas == 2
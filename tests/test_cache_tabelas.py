@@ -0,0 +1,47 @@
+import json
+
+import controller
+from controller import ApplicationController
+
+
+def _criar_controller(tmp_path, database="/dados/ORIGEM.FDB"):
+    config = {
+        "source": {
+            "type": "firebird",
+            "database": {
+                "database": database,
+                "host": "localhost",
+                "port": 3050,
+                "user": "SYSDBA",
+                "password": "masterkey",
+            },
+        },
+        "settings": {},
+    }
+    caminho_config = tmp_path / "config.json"
+    caminho_config.write_text(json.dumps(config), encoding="utf-8")
+    return ApplicationController(
+        str(caminho_config), tables_cache_path=str(tmp_path / "tabelas.json")
+    )
+
+
+def test_lista_de_tabelas_fica_em_cache_por_banco(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        controller, "listar_tabelas_firebird", lambda _con: ["CLIENTES", "PEDIDOS"]
+    )
+    app = _criar_controller(tmp_path)
+    assert app.get_cached_tables() is None
+
+    app._list_tables(None, "firebird")
+
+    assert app.get_cached_tables() == ["CLIENTES", "PEDIDOS"]
+    assert "masterkey" not in (tmp_path / "tabelas.json").read_text("utf-8")
+    outro_banco = _criar_controller(tmp_path, database="/dados/OUTRO.FDB")
+    assert outro_banco.get_cached_tables() is None
+
+
+def test_cache_corrompido_e_ignorado(tmp_path):
+    (tmp_path / "tabelas.json").write_text("{", encoding="utf-8")
+    app = _criar_controller(tmp_path)
+
+    assert app.get_cached_tables() is None
@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from html_logger import HtmlLogWriter
+from html_logger import HtmlLogWriter, obter_tamanho_banco_destino
 
 
 def test_html_logger_generates_report(tmp_path):
@@ -37,3 +37,25 @@ def test_html_logger_generates_report(tmp_path):
     assert "TB_CLIENTE" in conteudo
     assert "log-entry error" in conteudo
     assert "log-entry info" in conteudo
+
+
+def test_tamanho_destino_usa_database_files_sem_permissao_em_master_files():
+    consultas = []
+
+    class _Cursor:
+        def execute(self, consulta, parametros=()):
+            consultas.append(consulta)
+            self.resultado = (None,) if "master_files" in consulta else (65536,)
+
+        def fetchone(self):
+            return self.resultado
+
+        def close(self):
+            pass
+
+    class _Conexao:
+        def cursor(self):
+            return _Cursor()
+
+    assert obter_tamanho_banco_destino("mssql", _Conexao(), "Destino") == 65536
+    assert "sys.database_files" in consultas[-1]
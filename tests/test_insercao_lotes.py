@@ -0,0 +1,76 @@
+import pytest
+
+from dump import (
+    BaseDestinationHandler,
+    BulkTransactionAborted,
+    _inserir_com_bisecao,
+)
+
+
+class _HandlerFalso(BaseDestinationHandler):
+    def __init__(self, ids_invalidos=(), limite_lote=None):
+        super().__init__(connection=None)
+        self.ids_invalidos = set(ids_invalidos)
+        self.limite_lote = limite_lote
+        self.chamadas = 0
+        self.inseridos = []
+
+    def insert_batch(self, tabela, colunas, dados):
+        self.chamadas += 1
+        dados = list(dados)
+        if self.limite_lote is not None and len(dados) > self.limite_lote:
+            raise RuntimeError("Lote excede o limite do driver")
+        if any(linha[0] in self.ids_invalidos for linha in dados):
+            raise RuntimeError("Violation of PRIMARY KEY constraint: duplicate key")
+        self.inseridos.extend(dados)
+
+    def primary_key_columns(self, tabela):
+        return ["id"]
+
+    def suggest_new_primary_key_value(self, tabela, coluna):
+        return 1000
+
+
+def test_bisecao_insere_todos_os_registros_sem_intervencao():
+    handler = _HandlerFalso(limite_lote=3)
+    registros = [(indice, f"nome {indice}") for indice in range(10)]
+
+    inseridos = _inserir_com_bisecao(
+        handler, "CLIENTES", ["id", "nome"], registros, registros, print
+    )
+
+    assert inseridos == 10
+    assert sorted(handler.inseridos) == registros
+
+
+def test_bisecao_isola_registro_invalido_com_poucas_tentativas(monkeypatch):
+    handler = _HandlerFalso(ids_invalidos={37})
+    registros = [(indice, f"nome {indice}") for indice in range(64)]
+    mensagens = []
+    monkeypatch.setattr("builtins.input", lambda _prompt="": "")
+
+    inseridos = _inserir_com_bisecao(
+        handler, "CLIENTES", ["id", "nome"], registros, registros, mensagens.append
+    )
+
+    assert inseridos == 64
+    assert (1000, "nome 37") in handler.inseridos
+    assert handler.chamadas < 20
+    assert any("Registro 38" in mensagem for mensagem in mensagens)
+
+
+def test_bisecao_interrompe_quando_transacao_em_lote_e_abortada():
+    class _HandlerAbortado(_HandlerFalso):
+        def insert_batch(self, tabela, colunas, dados):
+            self.chamadas += 1
+            raise BulkTransactionAborted("transação abortada")
+
+    handler = _HandlerAbortado()
+    registros = [(indice, f"nome {indice}") for indice in range(8)]
+
+    with pytest.raises(BulkTransactionAborted):
+        _inserir_com_bisecao(
+            handler, "CLIENTES", ["id", "nome"], registros, registros, print
+        )
+
+    assert handler.chamadas == 1
@@ -0,0 +1,79 @@
+import threading
+from contextlib import closing
+
+import pytest
+
+from dump import _AjusteTamanhoLote, _ler_lotes_em_segundo_plano
+
+
+def test_leitura_em_segundo_plano_preserva_ordem_dos_lotes():
+    lotes = [[(indice,)] for indice in range(10)]
+
+    assert list(_ler_lotes_em_segundo_plano(iter(lotes), 2)) == lotes
+
+
+def test_leitura_em_segundo_plano_propaga_erro_da_origem():
+    def gerar():
+        yield [(1,)]
+        raise RuntimeError("conexão perdida")
+
+    lidos = []
+    with pytest.raises(RuntimeError, match="conexão perdida"):
+        for lote in _ler_lotes_em_segundo_plano(gerar(), 2):
+            lidos.append(lote)
+
+    assert lidos == [[(1,)]]
+
+
+def test_leitura_em_segundo_plano_encerra_produtor_quando_consumidor_para():
+    lidos_da_origem = []
+
+    def gerar():
+        for indice in range(100):
+            lidos_da_origem.append(indice)
+            yield [(indice,)]
+
+    leitor = _ler_lotes_em_segundo_plano(gerar(), 2)
+    assert next(leitor) == [(0,)]
+    leitor.close()
+
+    assert len(lidos_da_origem) < 100
+
+
+def test_leitura_em_segundo_plano_encerra_thread_quando_consumidor_falha():
+    def gerar():
+        indice = 0
+        while True:
+            indice += 1
+            yield [(indice,)]
+
+    with pytest.raises(RuntimeError, match="falha no destino"):
+        with closing(_ler_lotes_em_segundo_plano(gerar(), 2)) as lotes:
+            for _lote in lotes:
+                raise RuntimeError("falha no destino")
+
+    assert not any(
+        thread.name == "dump-leitura-lotes" for thread in threading.enumerate()
+    )
+
+
+def test_ajuste_tamanho_lote_dobra_ate_estabilizar():
+    ajuste = _AjusteTamanhoLote(1000)
+    # Vazão cresce até 4000 registros por lote e depois estabiliza.
+    taxas = {1000: 10_000.0, 2000: 20_000.0, 4000: 40_000.0, 8000: 40_500.0}
+
+    for _ in range(10):
+        if ajuste.congelado:
+            break
+        tamanho = ajuste.tamanho
+        ajuste.registrar(tamanho, tamanho / taxas.get(tamanho, 40_500.0))
+
+    assert ajuste.congelado
+    assert ajuste.tamanho in (4000, 8000)
+
+
+def test_ajuste_tamanho_lote_ignora_lotes_de_outro_tamanho():
+    ajuste = _AjusteTamanhoLote(1000)
+
+    assert ajuste.registrar(250, 0.01) is False
+    assert ajuste.tamanho == 1000
@@ -0,0 +1,93 @@
+import dump
+
+
+class _ConexaoFalsa:
+    def __init__(self, falhar_rollback=False):
+        self.falhar_rollback = falhar_rollback
+        self.fechada = False
+
+    def rollback(self):
+        if self.falhar_rollback:
+            raise RuntimeError("conexão quebrada")
+
+    def close(self):
+        self.fechada = True
+
+
+def test_pool_reutiliza_conexao_devolvida(monkeypatch):
+    criadas = []
+
+    def conectar(tipo, parametros):
+        conexao = _ConexaoFalsa()
+        criadas.append(conexao)
+        return conexao
+
+    monkeypatch.setattr(dump, "_conectar_por_tipo", conectar)
+    parametros = {"server": "localhost", "database": "teste_pool"}
+
+    try:
+        primeira = dump._obter_conexao("mssql", parametros, 2)
+        dump._devolver_conexao("mssql", parametros, 2, primeira)
+        segunda = dump._obter_conexao("mssql", parametros, 2)
+
+        assert segunda is primeira
+        assert len(criadas) == 1
+    finally:
+        dump.fechar_pools()
+
+
+def test_pool_descarta_conexao_com_falha(monkeypatch):
+    monkeypatch.setattr(
+        dump, "_conectar_por_tipo", lambda tipo, parametros: _ConexaoFalsa()
+    )
+    parametros = {"server": "localhost", "database": "teste_pool_falha"}
+
+    try:
+        quebrada = _ConexaoFalsa(falhar_rollback=True)
+        dump._devolver_conexao("mssql", parametros, 2, quebrada)
+        nova = dump._obter_conexao("mssql", parametros, 2)
+
+        assert quebrada.fechada
+        assert nova is not quebrada
+    finally:
+        dump.fechar_pools()
+
+
+def test_pool_descarta_conexao_ociosa_que_nao_responde(monkeypatch):
+    class _ConexaoEncerrada(_ConexaoFalsa):
+        def cursor(self):
+            raise RuntimeError("conexão encerrada pelo servidor")
+
+    nova = _ConexaoFalsa()
+    monkeypatch.setattr(dump, "_conectar_por_tipo", lambda tipo, parametros: nova)
+    monkeypatch.setattr(dump, "_OCIOSIDADE_MAXIMA_POOL", 0.0)
+    parametros = {"server": "localhost", "database": "teste_pool_ociosa"}
+
+    try:
+        encerrada = _ConexaoEncerrada()
+        dump._devolver_conexao("mssql", parametros, 2, encerrada)
+        obtida = dump._obter_conexao("mssql", parametros, 2)
+
+        assert obtida is nova
+        assert encerrada.fechada
+    finally:
+        dump.fechar_pools()
+
+
+def test_emprestimo_verificado_checa_conexao_recente(monkeypatch):
+    class _ConexaoEncerrada(_ConexaoFalsa):
+        def cursor(self):
+            raise RuntimeError("conexão encerrada pelo servidor")
+
+    nova = _ConexaoFalsa()
+    monkeypatch.setattr(dump, "_conectar_por_tipo", lambda tipo, parametros: nova)
+    parametros = {"server": "localhost", "database": "teste_pool_verificado"}
+
+    try:
+        encerrada = _ConexaoEncerrada()
+        dump._devolver_conexao("mssql", parametros, 2, encerrada)
+        with dump.emprestar_conexao("mssql", parametros, 2, verificar=True) as obtida:
+            assert obtida is nova
+        assert encerrada.fechada
+    finally:
+        dump.fechar_pools()
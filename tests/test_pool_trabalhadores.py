@@ -0,0 +1,23 @@
+import concurrent.futures
+import threading
+
+import pytest
+
+from controller import _DaemonThreadPool
+
+
+def test_pool_devolve_resultados_e_erros_em_threads_daemon():
+    def trabalho(valor):
+        if valor < 0:
+            raise ValueError(valor)
+        return valor, threading.current_thread().daemon
+
+    with _DaemonThreadPool(2) as executor:
+        futuros = [executor.submit(trabalho, valor) for valor in (1, 2, -1)]
+        concluidos = list(concurrent.futures.as_completed(futuros))
+
+    assert len(concluidos) == 3
+    assert futuros[0].result() == (1, True)
+    assert futuros[1].result() == (2, True)
+    with pytest.raises(ValueError):
+        futuros[2].result()
@@ -1,59 +1,3 @@
-import sys
-import types
-
-import pytest
-
-
-def _criar_stub_db_modules() -> None:
-    def _dummy(*args, **kwargs):  # pragma: no cover - apenas stub
-        raise NotImplementedError
-
-    mod_firebird = types.ModuleType("db_firebird")
-    atributos_firebird = [
-        "buscar_lotes_firebird",
-        "conectar_firebird",
-        "inserir_lote_firebird",
-        "limpar_tabela_firebird",
-        "listar_constraints_firebird",
-        "listar_indices_firebird",
-        "listar_procedures_firebird",
-        "listar_tabelas_firebird",
-        "listar_triggers_firebird",
-    ]
-    for atributo in atributos_firebird:
-        setattr(mod_firebird, atributo, _dummy)
-    sys.modules.setdefault("db_firebird", mod_firebird)
-
-    mod_mssql = types.ModuleType("db_mssql")
-    atributos_mssql = [
-        "ativar_constraint",
-        "ativar_constraints_tabelas",
-        "ativar_indice",
-        "ativar_trigger",
-        "conectar_mssql",
-        "definir_identity_insert",
-        "desativar_constraints_tabelas",
-        "desativar_indice",
-        "desativar_trigger",
-        "inserir_lote_mssql",
-        "limpar_tabela_destino",
-        "listar_constraints_desativadas",
-        "listar_constraints_mssql",
-        "listar_indices_ativos",
-        "listar_indices_mssql",
-        "listar_procedures_mssql",
-        "listar_tabelas_mssql",
-        "listar_triggers_ativas",
-        "listar_triggers_mssql",
-        "possui_coluna_identidade",
-    ]
-    for atributo in atributos_mssql:
-        setattr(mod_mssql, atributo, _dummy)
-    sys.modules.setdefault("db_mssql", mod_mssql)
-
-
-_criar_stub_db_modules()
-
 from dump import sanitizar_lote
 
 
@@ -1,34 +1,4 @@
 import logging
-import sys
-import types
-
-
-class _FakeProgrammingError(Exception):
-    """Exceção utilizada pelo stub da biblioteca fdb nos testes."""
-
-
-def _fake_connect_firebird(*args, **kwargs):  # pragma: no cover - não deve ser chamado
-    raise RuntimeError("fdb.connect não deve ser utilizado nos testes.")
-
-
-sys.modules.setdefault(
-    "fdb",
-    types.SimpleNamespace(
-        connect=_fake_connect_firebird,
-        ProgrammingError=_FakeProgrammingError,
-    ),
-)
-
-
-def _fake_connect_mssql(*args, **kwargs):  # pragma: no cover - não deve ser chamado
-    raise RuntimeError("pymssql.connect não deve ser utilizado nos testes.")
-
-
-sys.modules.setdefault(
-    "pymssql",
-    types.SimpleNamespace(connect=_fake_connect_mssql),
-)
-
 
 from dump import sanitizar_lote
 